@@ -0,0 +1,60 @@
+from django.urls import path
+
+from recipes.views import IngredientViewSet, RecipeViewSet, TagViewSet
+from users.views import UserViewSet
+
+from .async_views import async_view
+from .urls import urlpatterns as sync_urlpatterns
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}
+
+
+def async_route(route, viewset, actions, basename, detail, url_name=None,
+                **initkwargs):
+    view = viewset.as_view(
+        actions, basename=basename, detail=detail, **initkwargs
+    )
+    if url_name is None:
+        url_name = 'detail' if detail else 'list'
+    return path(route, async_view(view), name=f'{basename}-{url_name}')
+
+
+urlpatterns = [
+    async_route(
+        'api/recipes/', RecipeViewSet, LIST_ACTIONS, 'recipes', False
+    ),
+    async_route(
+        'api/recipes/<int:pk>/', RecipeViewSet, DETAIL_ACTIONS, 'recipes',
+        True
+    ),
+    async_route(
+        'api/recipes/download_shopping_cart/', RecipeViewSet,
+        {'get': 'download_shopping_cart'}, 'recipes', False,
+        url_name='download-shopping-cart',
+        **RecipeViewSet.download_shopping_cart.kwargs
+    ),
+    async_route('api/tags/', TagViewSet, {'get': 'list'}, 'tags', False),
+    async_route(
+        'api/tags/<int:pk>/', TagViewSet, {'get': 'retrieve'}, 'tags', True
+    ),
+    async_route(
+        'api/ingredients/', IngredientViewSet, {'get': 'list'},
+        'ingredients', False
+    ),
+    async_route(
+        'api/ingredients/<int:pk>/', IngredientViewSet, {'get': 'retrieve'},
+        'ingredients', True
+    ),
+    async_route(
+        'api/users/subscriptions/', UserViewSet, {'get': 'subscriptions'},
+        'users', False, url_name='subscriptions',
+        **UserViewSet.subscriptions.kwargs
+    ),
+    *sync_urlpatterns,
+]
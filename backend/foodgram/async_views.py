@@ -0,0 +1,54 @@
+import asyncio
+import contextvars
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from .middleware import check_connections
+
+read_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_READ_THREADS,
+    thread_name_prefix='async-read'
+)
+
+
+def buffer_streaming(response):
+    if not response.streaming:
+        return response
+    buffered = HttpResponse(
+        b''.join(response.streaming_content), status=response.status_code
+    )
+    for header, value in response.items():
+        buffered[header] = value
+    return buffered
+
+
+def run_view(view, request, *args, **kwargs):
+    close_old_connections()
+    check_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        return buffer_streaming(response)
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                read_executor,
+                partial(context.run, run_view, view, request, *args, **kwargs)
+            )
+        return await sync_to_async(run_view)(view, request, *args, **kwargs)
+    return wrapper
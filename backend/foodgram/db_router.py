@@ -0,0 +1,84 @@
+import random
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY_DATABASE = 'default'
+PRIMARY_ONLY_MODELS = {'authtoken.token', 'sessions.session'}
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+class ReadRouting:
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.wrote = False
+
+
+def choose_replica():
+    return random.choice(settings.REPLICA_DATABASES)
+
+
+@contextmanager
+def route_reads(alias):
+    routing = ReadRouting(alias)
+    token = current_routing.set(routing)
+    try:
+        yield routing
+    finally:
+        current_routing.reset(token)
+
+
+@contextmanager
+def use_primary():
+    routing = current_routing.get()
+    if routing is None or routing.alias is None:
+        yield
+        return
+    alias, routing.alias = routing.alias, None
+    try:
+        yield
+    finally:
+        routing.alias = alias
+
+
+def read_from_primary(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def replica_may_lag(written_at):
+    routing = current_routing.get()
+    if routing is None or routing.alias is None:
+        return False
+    return time.time() - written_at <= settings.REPLICA_PIN_SECONDS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if (
+            routing is None or routing.alias is None or routing.wrote
+            or model._meta.label_lower in PRIMARY_ONLY_MODELS
+        ):
+            return PRIMARY_DATABASE
+        return routing.alias
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DATABASE
@@ -0,0 +1,320 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import choose_replica, route_reads
+
+logger = logging.getLogger('foodgram.requests')
+
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SQL_PLACEHOLDER_LISTS = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+
+REPLICA_PIN_CACHE_KEY = 'replica-pin:{}'
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+def sql_signature(sql):
+    sql = SQL_LITERALS.sub('?', sql)
+    return SQL_PLACEHOLDER_LISTS.sub('(%s, ...)', sql)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0
+        self.serializer_time = 0
+        self.serializer_depth = 0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.signatures[sql_signature(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return {
+            signature: count
+            for signature, count in self.signatures.items() if count > 1
+        }
+
+    def as_dict(self, request, response):
+        return {
+            'view': view_name(request),
+            'status': response.status_code,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 3),
+            'duplicate_queries': sum(self.duplicates.values()),
+            'serializer_ms': round(self.serializer_time * 1000, 3),
+            'response_bytes': (
+                0 if response.streaming else len(response.content)
+            ),
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_metrics(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def check_connections():
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+def view_name(request):
+    match = request.resolver_match
+    name = match.view_name if match is not None else request.path
+    return f'{request.method} {name}'
+
+
+def timed_representation(to_representation):
+    @wraps(to_representation)
+    def wrapper(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None or metrics.serializer_depth:
+            return to_representation(self, instance)
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return to_representation(self, instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializer_depth -= 1
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument_serializers():
+    for serializer in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(serializer.to_representation, 'timed', False):
+            serializer.to_representation = timed_representation(
+                serializer.to_representation
+            )
+
+
+class RequestStats:
+    FIELDS = (
+        'total_ms', 'queries', 'sql_ms', 'duplicate_queries',
+        'serializer_ms', 'response_bytes',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, record, duplicates):
+        with self._lock:
+            stats = self._views.setdefault(record['view'], {
+                'requests': 0,
+                'max_ms': 0,
+                'duplicates': Counter(),
+                **{field: 0 for field in self.FIELDS},
+            })
+            stats['requests'] += 1
+            stats['max_ms'] = max(stats['max_ms'], record['total_ms'])
+            stats['duplicates'].update(duplicates)
+            for field in self.FIELDS:
+                stats[field] += record[field]
+
+    def summary(self):
+        with self._lock:
+            return {
+                view: {
+                    'requests': stats['requests'],
+                    'max_ms': stats['max_ms'],
+                    **{
+                        f'avg_{field}': round(
+                            stats[field] / stats['requests'], 3
+                        )
+                        for field in self.FIELDS
+                    },
+                    'duplicate_signatures': [
+                        {'sql': signature, 'count': count}
+                        for signature, count
+                        in stats['duplicates'].most_common(5)
+                    ],
+                }
+                for view, stats in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+request_stats = RequestStats()
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        instrument_serializers()
+        connection_created.connect(install_query_metrics)
+        for connection in connections.all():
+            install_query_metrics(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        record = metrics.as_dict(request, response)
+        duplicates = metrics.duplicates
+        request_stats.add(record, duplicates)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={record["sql_ms"]};desc="{record["queries"]} queries"',
+            f'serializer;dur={record["serializer_ms"]}',
+            f'total;dur={record["total_ms"]}',
+        ))
+        logger.info(json.dumps(record, ensure_ascii=False))
+        if duplicates:
+            logger.warning(json.dumps({
+                'view': record['view'],
+                'duplicate_queries': duplicates,
+            }, ensure_ascii=False))
+        return response
+
+
+def replica_pin_key(identity):
+    if not identity:
+        return None
+    return REPLICA_PIN_CACHE_KEY.format(
+        hashlib.sha1(identity.encode()).hexdigest()
+    )
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cache = caches[settings.REPLICA_PIN_CACHE]
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with route_reads(self.read_database(request)) as routing:
+            response = self.get_response(request)
+        return self.pin(request, response, routing)
+
+    async def __acall__(self, request):
+        with route_reads(self.read_database(request)) as routing:
+            response = await self.get_response(request)
+        return self.pin(request, response, routing)
+
+    def identities(self, request, response=None):
+        session = settings.SESSION_COOKIE_NAME
+        identities = [
+            request.META.get('HTTP_AUTHORIZATION'),
+            request.COOKIES.get(session),
+        ]
+        if response is not None and session in response.cookies:
+            identities.append(response.cookies[session].value)
+        return list(filter(None, map(replica_pin_key, identities)))
+
+    def read_database(self, request):
+        if request.method not in SAFE_METHODS:
+            return None
+        keys = self.identities(request)
+        if keys and self.cache.get_many(keys):
+            return None
+        return choose_replica()
+
+    def pin(self, request, response, routing):
+        if routing.wrote and response.status_code < 400:
+            self.cache.set_many(
+                dict.fromkeys(self.identities(request, response), True),
+                settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+
+class ConnectionHealthMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not any(
+            database.get('CONN_MAX_AGE') and database.get('CONN_HEALTH_CHECKS')
+            for database in settings.DATABASES.values()
+        ):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        check_connections()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        await sync_to_async(check_connections)()
+        return await self.get_response(request)
@@ -1,5 +1,7 @@
 import os
 
+from datetime import timedelta
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,6 +31,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.ConnectionHealthMiddleware',
+    'foodgram.middleware.RequestMetricsMiddleware',
+    'foodgram.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -38,7 +43,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram.urls'
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', 'foodgram.urls')
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -46,7 +51,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
@@ -98,9 +103,55 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS') != 'False',
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_PGBOUNCER') == 'True',
     }
 }
 
+REPLICA_DATABASES = []
+
+for number, replica in enumerate(
+    filter(None, map(str.strip, os.getenv('DB_REPLICAS', '').split(',')))
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = replica
+    else:
+        host, _, port = replica.partition(':')
+        DATABASES[alias]['HOST'] = host
+        DATABASES[alias]['PORT'] = port or DATABASES['default']['PORT']
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['foodgram.db_router.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+REPLICA_PIN_CACHE = 'default'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+    'responses': {
+        'BACKEND': os.getenv(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'responses'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -138,3 +189,73 @@ STATIC_URL = '/back_static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'back_static')
 
 AUTH_USER_MODEL = 'users.User'
+
+RECIPE_IMAGE_FORMAT = os.getenv('RECIPE_IMAGE_FORMAT', 'WEBP')
+
+RECIPE_IMAGE_QUALITY = int(os.getenv('RECIPE_IMAGE_QUALITY', 80))
+
+RECIPE_IMAGE_MAX_SIZE = 20
+
+RECIPE_IMAGE_PLACEHOLDER = STATIC_URL + 'recipes/placeholder.svg'
+
+BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', 2))
+
+ASYNC_READ_THREADS = int(os.getenv('ASYNC_READ_THREADS', 32))
+
+FEED_FANOUT_LIMIT = int(os.getenv('FEED_FANOUT_LIMIT', 5000))
+
+FEED_BACKFILL_LIMIT = 200
+
+FEED_BATCH_SIZE = 1000
+
+POPULARITY_HALF_LIFE = timedelta(hours=72)
+
+POPULARITY_WEIGHTS = {
+    'favorite': 1.0,
+    'shopping_cart': 0.5,
+}
+
+INGREDIENT_SEARCH_LIMIT = None
+
+INGREDIENT_INDEX_TTL = 300
+
+RECIPE_INDEX_TTL = 300
+
+RELATIONS_CACHE = 'default'
+
+RELATIONS_CACHE_TIMEOUT = 300
+
+VERSIONS_CACHE = 'default'
+
+HTTP_CACHE_MAX_AGE = 60
+
+RESPONSE_CACHE = 'responses'
+
+RESPONSE_CACHE_TIMEOUT = 600
+
+TOKEN_CACHE = os.getenv('TOKEN_CACHE') or None
+
+TOKEN_CACHE_SIZE = 1024
+
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 300))
+
+TOKEN_CACHE_LOCAL_TTL = 5
+
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'foodgram.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+from django.core.asgi import get_asgi_application
+from django.test import TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (
+    Ingredient, IngredientInRecipe, IngredientList, Recipe,
+)
+from users.models import User
+
+
+def asgi_get(application, path, headers=()):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    body = b''.join(
+        message.get('body', b'') for message in messages
+        if message['type'] == 'http.response.body'
+    )
+    return messages[0]['status'], body
+
+
+@override_settings(ROOT_URLCONF='foodgram.async_urls')
+class AsgiApplicationTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='cook@foodgram.local', username='cook',
+            first_name='Cook', last_name='Cook', password='password'
+        )
+        self.headers = [(
+            b'authorization',
+            f'Token {Token.objects.create(user=self.user).key}'.encode()
+        )]
+        recipe = Recipe.objects.create(
+            author=self.user, name='Блины', text='Блины',
+            image='recipes/pancakes.png', cooking_time=20
+        )
+        IngredientInRecipe.objects.create(
+            recipe=recipe, amount=200,
+            ingredients=Ingredient.objects.create(
+                name='мука', measurement_unit='г'
+            )
+        )
+        IngredientList.objects.create(recipe=recipe, user=self.user)
+        self.application = get_asgi_application()
+
+    def test_recipe_list(self):
+        status, _ = asgi_get(
+            self.application, '/api/recipes/', self.headers
+        )
+        self.assertEqual(status, 200)
+
+    def test_download_shopping_cart(self):
+        status, body = asgi_get(
+            self.application, '/api/recipes/download_shopping_cart/',
+            self.headers
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(body.decode(), 'мука - 200 г\n')
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_metrics_count_queries_of_sync_views(self):
+        application = get_asgi_application()
+        with self.assertLogs('foodgram.requests') as logs:
+            status, _ = asgi_get(application, '/api/users/me/', self.headers)
+        self.assertEqual(status, 200)
+        self.assertGreater(json.loads(logs.records[0].msg)['queries'], 0)
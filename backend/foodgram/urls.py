@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from .views import RequestStatsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/stats/', RequestStatsView.as_view(), name='request-stats'),
     path('api/', include('users.urls')),
     path('api/', include('recipes.urls')),
 ]
@@ -0,0 +1,18 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.permissions import IsAdmin
+
+from .middleware import request_stats
+
+
+class RequestStatsView(APIView):
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(request_stats.summary())
+
+    def delete(self, request):
+        request_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,26 @@
+import os
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+CACHE_BACKEND_SETTINGS = ('CACHE_BACKEND', 'RESPONSE_CACHE_BACKEND')
+PROCESS_LOCAL_CACHE_ERROR = (
+    'GUNICORN_WORKERS={} требует общего кэша: {} хранят кэш в памяти '
+    'процесса. Задайте общий бэкенд кэша или запустите один воркер.'
+)
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+max_requests = 2000
+max_requests_jitter = 200
+
+local_caches = [
+    name for name in CACHE_BACKEND_SETTINGS
+    if os.getenv(name, LOCMEM_CACHE) == LOCMEM_CACHE
+]
+if workers > 1 and local_caches:
+    raise RuntimeError(
+        PROCESS_LOCAL_CACHE_ERROR.format(workers, ', '.join(local_caches))
+    )
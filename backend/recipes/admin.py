@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from recipes.images import render_image
 from recipes.models import (
     Favorite, Ingredient, IngredientInRecipe, IngredientList, Recipe, Tag,
 )
@@ -7,14 +8,25 @@ from recipes.models import (
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'author', 'name', 'pub_date')
+    list_display = (
+        'pk', 'author', 'name', 'pub_date', 'favorites_count',
+        'in_carts_count'
+    )
     exclude = ("ingredients",)
     search_fields = ('author', 'name', 'tags')
-    readonly_fields = ('pub_date', )
+    readonly_fields = (
+        'pub_date', 'favorites_count', 'in_carts_count', 'image_full',
+        'image_card', 'image_thumbnail'
+    )
     list_filter = ('author', 'name', 'tags')
     filter_horizontal = ('tags',)
     empty_value_display = '-пусто-'
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            render_image(obj)
+
 
 @admin.register(IngredientInRecipe)
 class IngredientsInRecipesAdmin(admin.ModelAdmin):
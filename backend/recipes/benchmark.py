@@ -0,0 +1,405 @@
+import asyncio
+import io
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import (
+    close_old_connections, connection, connections, reset_queries, transaction,
+)
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.authtoken.models import Token
+
+from foodgram import async_views
+from foodgram.middleware import check_connections
+from users.models import Subscription, User
+
+from .counters import recount
+from .models import (
+    TAG_BITS, TAG_LIMIT_ERROR, Favorite, Ingredient, IngredientInRecipe,
+    IngredientList, Recipe, RecipeTag, Tag, free_tag_bits, tags_mask,
+)
+from .search import ingredient_index
+
+SEED_IMAGE = 'back_media/seed.png'
+SEED_TAG_COLORS = ('#E26C2D', '#49B64E', '#8775D2', '#F0C419', '#2D9CDB')
+
+
+@contextmanager
+def test_database():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    for alias in connections:
+        mirror = connections[alias].settings_dict['TEST'].get('MIRROR')
+        if mirror:
+            connections[alias].close()
+            connections[alias].creation.set_as_test_mirror(
+                connections[mirror].settings_dict
+            )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@transaction.atomic
+def seed(users=50, recipes=500, tags=5, ingredients_per_recipe=8,
+         favorites=20, cart=10, subscriptions=10, seed=0):
+    rng = random.Random(seed)
+    if not Ingredient.objects.exists():
+        call_command('load_ingredients', stdout=io.StringIO())
+    ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(
+            email=f'seed{number}@foodgram.local',
+            username=f'seed{number}',
+            first_name='Seed',
+            last_name=str(number),
+            password=password,
+        )
+        for number in range(users)
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith='seed'
+    ).values_list('id', flat=True))
+    bits = free_tag_bits()
+    if len(bits) < tags:
+        raise ValidationError(TAG_LIMIT_ERROR.format(TAG_BITS))
+    Tag.objects.bulk_create(
+        Tag(
+            name=f'Тег {number}',
+            slug=f'seed-tag-{number}',
+            color=SEED_TAG_COLORS[number % len(SEED_TAG_COLORS)],
+            bit=bit,
+        )
+        for number, bit in zip(range(tags), bits)
+    )
+    tag_bits = dict(Tag.objects.filter(
+        slug__startswith='seed-tag-'
+    ).values_list('id', 'bit'))
+    tag_ids = list(tag_bits)
+    recipe_tags = [
+        rng.sample(tag_ids, rng.randint(1, len(tag_ids)))
+        for _ in range(recipes)
+    ]
+    Recipe.objects.bulk_create(
+        Recipe(
+            author_id=rng.choice(user_ids),
+            name=f'Рецепт {number}',
+            text=f'Описание рецепта {number}',
+            image=SEED_IMAGE,
+            cooking_time=rng.randint(1, 120),
+            tags_mask=tags_mask(tag_bits[tag_id] for tag_id in tag_list),
+        )
+        for number, tag_list in enumerate(recipe_tags)
+    )
+    recipe_ids = list(
+        Recipe.objects.order_by('id').values_list('id', flat=True)
+    )
+    RecipeTag.objects.bulk_create(
+        RecipeTag(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id, tag_list in zip(recipe_ids, recipe_tags)
+        for tag_id in tag_list
+    )
+    IngredientInRecipe.objects.bulk_create(
+        IngredientInRecipe(
+            recipe_id=recipe_id,
+            ingredients_id=ingredient_id,
+            amount=rng.randint(1, 500),
+        )
+        for recipe_id in recipe_ids
+        for ingredient_id in rng.sample(
+            ingredient_ids, min(ingredients_per_recipe, len(ingredient_ids))
+        )
+    )
+    for model, field, targets, per_user in (
+        (Favorite, 'recipe_id', recipe_ids, favorites),
+        (IngredientList, 'recipe_id', recipe_ids, cart),
+        (Subscription, 'author_id', user_ids, subscriptions),
+    ):
+        model.objects.bulk_create(
+            model(user_id=user_id, **{field: target})
+            for user_id in user_ids
+            for target in rng.sample(targets, min(per_user, len(targets)))
+            if target != user_id or model is not Subscription
+        )
+    Token.objects.bulk_create(
+        Token(key=Token.generate_key(), user_id=user_id)
+        for user_id in user_ids
+    )
+    recount()
+    ingredient_index.invalidate()
+    return {
+        'users': len(user_ids),
+        'recipes': len(recipe_ids),
+        'tags': len(tag_ids),
+        'ingredients': len(ingredient_ids),
+    }
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def consume(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def measure(client, url, iterations=20):
+    for cache in caches.all():
+        cache.clear()
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response = consume(client.get(url))
+    query_count = len(queries)
+    tracemalloc.start()
+    consume(client.get(url))
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        consume(client.get(url))
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'url': url,
+        'queries': query_count,
+        'response_bytes': len(response),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'peak_memory_kb': round(peak_memory / 1024, 1),
+    }
+
+
+def explain_plan(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]['Plan']
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def sequential_scans(plan):
+    if isinstance(plan, list):
+        tables = set(connection.introspection.table_names())
+        return sorted({
+            detail.split()[1] for detail in plan
+            if detail.startswith('SCAN ') and ' USING ' not in detail
+            and detail.split()[1] in tables
+        })
+    tables = set()
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan':
+            tables.add(node['Relation Name'])
+        nodes.extend(node.get('Plans', ()))
+    return sorted(tables)
+
+
+def explain_endpoint(client, url, ignore=()):
+    with CaptureQueriesContext(connection) as queries:
+        consume(client.get(url))
+    report = {'url': url, 'queries': len(queries), 'sequential_scans': []}
+    for query in queries:
+        if not query['sql'].lstrip().upper().startswith('SELECT'):
+            continue
+        tables = [
+            table for table in sequential_scans(explain_plan(query['sql']))
+            if table not in ignore
+        ]
+        if tables:
+            report['sequential_scans'].append(
+                {'sql': query['sql'], 'tables': tables}
+            )
+    return report
+
+
+def benchmark_headers():
+    user = User.objects.filter(
+        subscriber__isnull=False, favorites__isnull=False
+    ).first()
+    token = Token.objects.get(user=user)
+    return {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+
+
+def benchmark_client():
+    return Client(**benchmark_headers())
+
+
+def benchmark_urls():
+    recipe = Recipe.objects.order_by('-favorites_count').first()
+    return {
+        'recipe_list': '/api/recipes/',
+        'recipe_detail': f'/api/recipes/{recipe.id}/',
+        'ingredient_search': '/api/ingredients/?name=мук',
+        'subscriptions': '/api/users/subscriptions/?recipes_limit=3',
+        'download_shopping_cart': '/api/recipes/download_shopping_cart/',
+    }
+
+
+@contextmanager
+def slow_database(delay):
+    def slow_execute(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if slow_execute not in connection.execute_wrappers:
+            connection.execute_wrappers.append(slow_execute)
+
+    for alias in connections:
+        install(None, connections[alias])
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for alias in connections:
+            wrappers = connections[alias].execute_wrappers
+            if slow_execute in wrappers:
+                wrappers.remove(slow_execute)
+
+
+@contextmanager
+def slow_connect(delay):
+    def connect(sender, connection, **kwargs):
+        time.sleep(delay)
+
+    connection_created.connect(connect)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(connect)
+
+
+@contextmanager
+def connection_settings(**options):
+    saved = {}
+    for alias in connections:
+        connections[alias].close()
+        saved[alias] = {
+            key: connections[alias].settings_dict.get(key) for key in options
+        }
+        connections[alias].settings_dict.update(options)
+    try:
+        yield
+    finally:
+        for alias, values in saved.items():
+            connections[alias].close()
+            connections[alias].settings_dict.update(values)
+
+
+def measure_connections(client, url, iterations, max_age, health_checks):
+    opened = []
+
+    def count(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    timings = []
+    with connection_settings(
+        CONN_MAX_AGE=max_age, CONN_HEALTH_CHECKS=health_checks
+    ):
+        connection_created.connect(count)
+        try:
+            for _ in range(iterations):
+                started = time.perf_counter()
+                close_old_connections()
+                check_connections()
+                consume(client.get(url))
+                close_old_connections()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(count)
+    return {
+        'conn_max_age': max_age,
+        'health_checks': health_checks,
+        'connections_opened': len(opened),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+    }
+
+
+def concurrency_report(timings, elapsed):
+    return {
+        'requests': len(timings),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+    }
+
+
+def measure_sync(headers, url, requests, workers):
+    def call(_):
+        started = time.perf_counter()
+        consume(Client(**headers).get(url))
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        timings = list(pool.map(call, range(requests)))
+    return concurrency_report(timings, time.perf_counter() - started)
+
+
+@contextmanager
+def read_threads(threads):
+    saved = async_views.read_executor
+    async_views.read_executor = ThreadPoolExecutor(
+        max_workers=threads, thread_name_prefix='async-read'
+    )
+    try:
+        yield
+    finally:
+        async_views.read_executor.shutdown()
+        async_views.read_executor = saved
+
+
+def measure_async(headers, url, requests, concurrency, threads):
+    headers = {
+        key[5:].replace('_', '-').lower(): value
+        for key, value in headers.items() if key.startswith('HTTP_')
+    }
+
+    async def run():
+        client = AsyncClient()
+        limit = asyncio.Semaphore(concurrency)
+        timings = []
+
+        async def call():
+            async with limit:
+                started = time.perf_counter()
+                consume(await client.get(url, **headers))
+                timings.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        return concurrency_report(timings, time.perf_counter() - started)
+
+    with override_settings(ROOT_URLCONF='foodgram.async_urls'):
+        with read_threads(threads):
+            return asyncio.run(run())
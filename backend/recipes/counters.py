@@ -0,0 +1,36 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import Subscription, User
+
+from .models import Favorite, IngredientInRecipe, IngredientList, Recipe
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def recount():
+    return {
+        'recipes': Recipe.objects.update(
+            favorites_count=count_subquery(Favorite, 'recipe'),
+            in_carts_count=count_subquery(IngredientList, 'recipe'),
+            ingredients_count=count_subquery(IngredientInRecipe, 'recipe'),
+        ),
+        'users': User.objects.update(
+            recipes_count=count_subquery(Recipe, 'author'),
+            followers_count=count_subquery(Subscription, 'author'),
+        ),
+    }
+
+
+def change_counter(queryset, field, delta):
+    if not delta:
+        return 0
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
@@ -0,0 +1,44 @@
+import csv
+import json
+
+SHOPPING_CART_FORMATS = {
+    'txt': 'text/plain; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+}
+SHOPPING_CART_CSV_HEADER = ('name', 'measurement_unit', 'amount')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_txt(items):
+    for item in items:
+        yield f'{item["name"]} - {item["amount"]} {item["measurement_unit"]}\n'
+
+
+def export_csv(items):
+    writer = csv.writer(Echo())
+    yield writer.writerow(SHOPPING_CART_CSV_HEADER)
+    for item in items:
+        yield writer.writerow(
+            [item[field] for field in SHOPPING_CART_CSV_HEADER]
+        )
+
+
+def export_json(items):
+    yield '['
+    separator = ''
+    for item in items:
+        yield separator + json.dumps(item, ensure_ascii=False)
+        separator = ','
+    yield ']'
+
+
+EXPORTERS = {
+    'txt': export_txt,
+    'csv': export_csv,
+    'json': export_json,
+}
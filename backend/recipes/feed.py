@@ -0,0 +1,67 @@
+from django.conf import settings
+
+from users.models import User
+
+from .models import Recipe, TimelineEntry
+
+
+def push_recipe(recipe_id):
+    recipe = Recipe.objects.select_related('author').filter(
+        id=recipe_id
+    ).first()
+    if recipe is None:
+        return 0
+    if recipe.author.followers_count > settings.FEED_FANOUT_LIMIT:
+        return 0
+    entries = TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe.id,
+                author_id=recipe.author_id,
+                pub_date=recipe.pub_date,
+            )
+            for user_id in recipe.author.author.values_list(
+                'user_id', flat=True
+            ).iterator()
+        ),
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    return len(entries)
+
+
+def backfill_timeline(user_id, author_id):
+    recipes = Recipe.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.FEED_BACKFILL_LIMIT]
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            )
+            for recipe_id, pub_date in recipes
+        ),
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune_timeline(user_id, author_id):
+    return TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()[0]
+
+
+def get_feed_sources(user):
+    sources = [(TimelineEntry.objects.filter(user=user), 'recipe_id')]
+    pulled = list(User.objects.filter(
+        author__user=user,
+        followers_count__gt=settings.FEED_FANOUT_LIMIT,
+    ).values_list('id', flat=True))
+    if pulled:
+        sources.append((Recipe.objects.filter(author__in=pulled), 'id'))
+    return sources
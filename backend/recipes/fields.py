@@ -0,0 +1,59 @@
+import base64
+import binascii
+import re
+import uuid
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from rest_framework import serializers
+
+from .images import get_source_extension
+
+INVALID_IMAGE_ERROR = 'Загрузите корректное изображение в формате base64'
+IMAGE_SIZE_ERROR = 'Размер изображения не должен превышать {} МБ'
+
+DATA_URI = re.compile(r'^data:image/[\w.+-]+;base64,')
+
+
+class Base64ImageUploadField(serializers.Field):
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            raise serializers.ValidationError(INVALID_IMAGE_ERROR)
+        try:
+            content = base64.b64decode(
+                DATA_URI.sub('', data, count=1), validate=True
+            )
+        except (binascii.Error, ValueError):
+            raise serializers.ValidationError(INVALID_IMAGE_ERROR)
+        if not content:
+            raise serializers.ValidationError(INVALID_IMAGE_ERROR)
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        if len(content) > max_size * 1024 * 1024:
+            raise serializers.ValidationError(
+                IMAGE_SIZE_ERROR.format(max_size)
+            )
+        try:
+            extension = get_source_extension(content)
+        except (OSError, SyntaxError, ValueError):
+            raise serializers.ValidationError(INVALID_IMAGE_ERROR)
+        return ContentFile(content, name=f'{uuid.uuid4()}.{extension}')
+
+
+class RecipeImageField(serializers.ImageField):
+    def __init__(self, rendition, **kwargs):
+        self.rendition = rendition
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return getattr(instance, f'image_{self.rendition}') or instance.image
+
+    def to_representation(self, value):
+        if value:
+            return super().to_representation(value)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(
+                settings.RECIPE_IMAGE_PLACEHOLDER
+            )
+        return settings.RECIPE_IMAGE_PLACEHOLDER
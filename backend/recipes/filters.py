@@ -1,6 +1,12 @@
+from django.db.models import Case, IntegerField, When
 from django_filters import rest_framework as filters
 
 from .models import Ingredient, Recipe, Tag
+from .search import ingredient_index, search_recipes
+
+POPULAR_ORDERING = 'popular'
+TAGS_MATCH_ANY = 'any'
+TAGS_MATCH_ALL = 'all'
 
 
 class RecipeFilters(filters.FilterSet):
@@ -9,6 +15,15 @@ class RecipeFilters(filters.FilterSet):
         queryset=Tag.objects.all(),
         label='Tags',
         to_field_name="slug",
+        method='get_tags',
+    )
+    tags_match = filters.ChoiceFilter(
+        choices=(
+            (TAGS_MATCH_ANY, 'Любой из тегов'),
+            (TAGS_MATCH_ALL, 'Все теги'),
+        ),
+        method='skip_filter',
+        label='Tags match'
     )
 
     is_favorited = filters.BooleanFilter(
@@ -18,10 +33,34 @@ class RecipeFilters(filters.FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart',
     )
+    search = filters.CharFilter(
+        method='get_search',
+        label='Search'
+    )
+    ordering = filters.ChoiceFilter(
+        choices=((POPULAR_ORDERING, 'Популярные'),),
+        method='get_ordering',
+        label='Ordering'
+    )
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags', 'tags_match', 'author', 'is_favorited',
+            'is_in_shopping_cart', 'search', 'ordering'
+        )
+
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.with_tags(
+            value,
+            match_all=self.form.cleaned_data.get('tags_match')
+            == TAGS_MATCH_ALL
+        )
+
+    def skip_filter(self, queryset, name, value):
+        return queryset
 
     def get_favorited(self, queryset, name, value):
         user = self.request.user
@@ -35,6 +74,17 @@ class RecipeFilters(filters.FilterSet):
             return queryset.filter(ingredient_list__user=user)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_recipes(queryset, value)
+
+    def get_ordering(self, queryset, name, value):
+        if value == POPULAR_ORDERING:
+            return queryset.order_by('-popularity', '-id')
+        return queryset
+
 
 class IngredientFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', method='start_name')
@@ -44,4 +94,8 @@ class IngredientFilter(filters.FilterSet):
         fields = ('name',)
 
     def start_name(self, queryset, slug, name):
-        return queryset.filter(name__startswith=name)
+        ids = [item['id'] for item in ingredient_index.search(name)]
+        return queryset.filter(pk__in=ids).order_by(Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        ))
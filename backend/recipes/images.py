@@ -0,0 +1,100 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+RENDITIONS = {
+    'full': (1280, 1280),
+    'card': (480, 480),
+    'thumbnail': (160, 160),
+}
+IMAGE_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+SOURCE_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+IMAGE_FIELDS = ('image', *(f'image_{name}' for name in RENDITIONS))
+
+
+def get_image_format():
+    image_format = settings.RECIPE_IMAGE_FORMAT
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def encode(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(
+        buffer, image_format,
+        quality=settings.RECIPE_IMAGE_QUALITY, optimize=True
+    )
+    return buffer.getvalue()
+
+
+def make_renditions(source):
+    image_format = get_image_format()
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert(
+                'RGBA' if 'transparency' in image.info else 'RGB'
+            )
+        renditions = {}
+        for name, size in RENDITIONS.items():
+            image = image.copy()
+            image.thumbnail(size, Image.LANCZOS)
+            renditions[name] = encode(image, image_format)
+    return renditions, IMAGE_EXTENSIONS[image_format]
+
+
+def get_source_extension(content):
+    with Image.open(io.BytesIO(content)) as image:
+        image.verify()
+        image_format = image.format
+    if image_format not in SOURCE_EXTENSIONS:
+        raise ValueError(f'Unsupported image format: {image_format}')
+    return SOURCE_EXTENSIONS[image_format]
+
+
+def save_renditions(recipe, update_fields=()):
+    recipe.image.open('rb')
+    try:
+        renditions, extension = make_renditions(recipe.image)
+    finally:
+        recipe.image.close()
+    basename = os.path.splitext(os.path.basename(recipe.image.name))[0]
+    fields = list(update_fields)
+    for name, content in renditions.items():
+        field = getattr(recipe, f'image_{name}')
+        if field:
+            field.delete(save=False)
+        field.save(
+            f'{basename}_{name}.{extension}', ContentFile(content),
+            save=False
+        )
+        fields.append(f'image_{name}')
+    recipe.save(update_fields=fields)
+
+
+def replace_image(recipe, image):
+    stale = [
+        getattr(recipe, field).name for field in IMAGE_FIELDS
+        if getattr(recipe, field)
+    ]
+    recipe.image.save(image.name, image, save=False)
+    for name in RENDITIONS:
+        setattr(recipe, f'image_{name}', '')
+    return stale
+
+
+def delete_images(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def render_image(recipe):
+    recipe.image_status = recipe.IMAGE_READY
+    save_renditions(recipe, update_fields=('image_status',))
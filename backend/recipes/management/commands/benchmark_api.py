@@ -0,0 +1,43 @@
+import json
+
+from datetime import datetime, timezone
+
+from recipes.benchmark import (
+    benchmark_client, benchmark_urls, measure, test_database,
+)
+
+from .seed_data import Command as SeedCommand
+
+
+class Command(SeedCommand):
+    help = (
+        'Замеряет количество запросов, задержку и память для основных '
+        'эндпоинтов API на синтетических данных в тестовой базе'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output')
+
+    def handle(self, *args, **options):
+        with test_database():
+            scale = self.seed(options)
+            client = benchmark_client()
+            results = {
+                name: measure(client, url, options['iterations'])
+                for name, url in benchmark_urls().items()
+            }
+        report = json.dumps({
+            'label': options['label'],
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'scale': scale,
+            'iterations': options['iterations'],
+            'endpoints': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,73 @@
+import json
+
+from datetime import datetime, timezone
+
+from recipes.benchmark import (
+    benchmark_headers, benchmark_urls, measure_async, measure_sync,
+    slow_database, test_database,
+)
+
+from .seed_data import Command as SeedCommand
+
+CONCURRENCY_URLS = (
+    'recipe_list', 'recipe_detail', 'ingredient_search', 'subscriptions',
+)
+
+
+class Command(SeedCommand):
+    help = (
+        'Сравнивает пропускную способность синхронного (WSGI) и '
+        'асинхронного (ASGI) режимов при медленной базе данных'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument(
+            '--threads', type=int, default=3,
+            help=(
+                'Количество потоков в обоих режимах: синхронных воркеров '
+                'и потоков чтения асинхронных view'
+            )
+        )
+        parser.add_argument(
+            '--db-delay', type=float, default=25,
+            help='Искусственная задержка каждого SQL-запроса, мс'
+        )
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output')
+
+    def handle(self, *args, **options):
+        with test_database():
+            scale = self.seed(options)
+            headers = benchmark_headers()
+            urls = benchmark_urls()
+            results = {}
+            with slow_database(options['db_delay'] / 1000):
+                for name in CONCURRENCY_URLS:
+                    results[name] = {
+                        'url': urls[name],
+                        'sync': measure_sync(
+                            headers, urls[name], options['requests'],
+                            options['threads']
+                        ),
+                        'async': measure_async(
+                            headers, urls[name], options['requests'],
+                            options['concurrency'], options['threads']
+                        ),
+                    }
+        report = json.dumps({
+            'label': options['label'],
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'scale': scale,
+            'db_delay_ms': options['db_delay'],
+            'threads': options['threads'],
+            'concurrency': options['concurrency'],
+            'endpoints': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connection
+
+from recipes.benchmark import (
+    benchmark_client, measure_connections, slow_connect, test_database,
+)
+
+from .seed_data import Command as SeedCommand
+
+RECIPE_LIST_URL = '/api/recipes/'
+
+
+class Command(SeedCommand):
+    help = (
+        'Сравнивает задержку списка рецептов с новым соединением с базой '
+        'на каждый запрос и с постоянными соединениями'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument(
+            '--conn-max-age', type=int,
+            default=settings.DATABASES['default']['CONN_MAX_AGE'] or 60,
+            help='Время жизни постоянного соединения, с'
+        )
+        parser.add_argument(
+            '--connect-delay', type=float, default=0,
+            help='Искусственная задержка установки соединения, мс'
+        )
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == 'sqlite':
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    directory, 'benchmark.sqlite3'
+                )
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        with test_database():
+            scale = self.seed(options)
+            client = benchmark_client()
+            with slow_connect(options['connect_delay'] / 1000):
+                results = [
+                    measure_connections(
+                        client, RECIPE_LIST_URL, options['iterations'],
+                        max_age, health_checks
+                    )
+                    for max_age, health_checks in (
+                        (0, False),
+                        (options['conn_max_age'], False),
+                        (options['conn_max_age'], True),
+                    )
+                ]
+        report = json.dumps({
+            'label': options['label'],
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'vendor': settings.DATABASES['default']['ENGINE'],
+            'scale': scale,
+            'url': RECIPE_LIST_URL,
+            'iterations': options['iterations'],
+            'connect_delay_ms': options['connect_delay'],
+            'results': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
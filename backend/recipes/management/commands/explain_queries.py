@@ -0,0 +1,74 @@
+import json
+
+from datetime import datetime, timezone
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from recipes.benchmark import (
+    benchmark_client, benchmark_urls, explain_endpoint, test_database,
+)
+from recipes.models import Tag
+
+from .seed_data import Command as SeedCommand
+
+
+class Command(SeedCommand):
+    help = (
+        'Выполняет EXPLAIN для запросов основных эндпоинтов API на '
+        'синтетических данных и сообщает о последовательных сканированиях'
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--ignore-table', action='append', default=[],
+            help='Не сообщать о сканировании этой таблицы'
+        )
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Завершиться с ошибкой при найденных сканированиях'
+        )
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output')
+
+    def handle(self, *args, **options):
+        with test_database():
+            scale = self.seed(options)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            client = benchmark_client()
+            urls = benchmark_urls()
+            urls.update({
+                'recipe_list_favorited': '/api/recipes/?is_favorited=1',
+                'recipe_list_cart': '/api/recipes/?is_in_shopping_cart=1',
+                'recipe_list_tags': '/api/recipes/?tags={}'.format(
+                    Tag.objects.values_list('slug', flat=True).first()
+                ),
+                'recipe_list_popular': '/api/recipes/?ordering=popular',
+                'feed': '/api/recipes/feed/',
+            })
+            results = {
+                name: explain_endpoint(client, url, options['ignore_table'])
+                for name, url in urls.items()
+            }
+        report = json.dumps({
+            'label': options['label'],
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'vendor': connection.vendor,
+            'scale': scale,
+            'endpoints': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
+        scanned = sorted(
+            name for name, result in results.items()
+            if result['sequential_scans']
+        )
+        if options['strict'] and scanned:
+            raise CommandError(
+                'Последовательные сканирования: {}'.format(', '.join(scanned))
+            )
@@ -0,0 +1,75 @@
+import csv
+import json
+import os
+import time
+
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+DEFAULT_PATH = os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv')
+CSV_HEADER = ['name', 'measurement_unit']
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        for number, row in enumerate(reader):
+            if number == 0 and row == CSV_HEADER:
+                continue
+            if row:
+                yield row[0], row[1]
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as file:
+        for item in json.load(file):
+            yield item['name'], item['measurement_unit']
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV или JSON файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise CommandError(f'Неподдерживаемый формат файла: {path}')
+        rows = (
+            Ingredient(
+                name=name.strip(), measurement_unit=measurement_unit.strip()
+            )
+            for name, measurement_unit in reader(path)
+        )
+        started = time.perf_counter()
+        total = 0
+        before = Ingredient.objects.count()
+        with transaction.atomic():
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                total += len(batch)
+        created = Ingredient.objects.count() - before
+        ingredient_index.invalidate()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано строк: {total}, добавлено ингредиентов: {created} '
+            f'за {elapsed:.2f} с ({total / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики избранного, списков покупок и рецептов'
+
+    def handle(self, *args, **options):
+        updated = recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано рецептов: {updated["recipes"]}, '
+            f'пользователей: {updated["users"]}'
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import render_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и для уже обработанных рецептов'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(image_thumbnail='')
+        rendered = 0
+        for recipe in recipes.iterator():
+            render_image(recipe)
+            rendered += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {rendered}'
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from recipes.benchmark import seed
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--tags', type=int, default=5)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--favorites', type=int, default=20)
+        parser.add_argument('--cart', type=int, default=10)
+        parser.add_argument('--subscriptions', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def seed(self, options):
+        return seed(
+            users=options['users'],
+            recipes=options['recipes'],
+            tags=options['tags'],
+            ingredients_per_recipe=options['ingredients_per_recipe'],
+            favorites=options['favorites'],
+            cart=options['cart'],
+            subscriptions=options['subscriptions'],
+            seed=options['seed'],
+        )
+
+    def handle(self, *args, **options):
+        created = self.seed(options)
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{name}: {count}' for name, count in created.items())
+        ))
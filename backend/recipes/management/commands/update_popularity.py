@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recipes.popularity import update_popularity
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает популярность рецептов по новым событиям'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать популярность по всем событиям заново'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = update_popularity(
+            full=options['full'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено рецептов: {updated}'
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientInRecipe = apps.get_model('recipes', 'IngredientInRecipe')
+    duplicates = Ingredient.objects.values(
+        'name', 'measurement_unit'
+    ).annotate(
+        keep=models.Min('id'), total=models.Count('id')
+    ).filter(total__gt=1).order_by()
+    for group in duplicates:
+        ids = Ingredient.objects.filter(
+            name=group['name'], measurement_unit=group['measurement_unit']
+        ).values_list('id', flat=True)
+        seen = set()
+        for item in IngredientInRecipe.objects.filter(
+            ingredients_id__in=ids
+        ).order_by('ingredients_id'):
+            if item.recipe_id in seen:
+                item.delete()
+                continue
+            seen.add(item.recipe_id)
+            if item.ingredients_id != group['keep']:
+                item.ingredients_id = group['keep']
+                item.save(update_fields=('ingredients',))
+        Ingredient.objects.filter(id__in=ids).exclude(
+            id=group['keep']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_alter_favorite_recipe'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_measured_ingredient'),
+        ),
+    ]
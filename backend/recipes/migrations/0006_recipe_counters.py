@@ -0,0 +1,47 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:01
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(models.Subquery(
+        model.objects.filter(**{field: models.OuterRef('pk')}).order_by(
+        ).values(field).annotate(
+            total=models.Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Favorite = apps.get_model('recipes', 'Favorite')
+    IngredientList = apps.get_model('recipes', 'IngredientList')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    User = apps.get_model('users', 'User')
+    Recipe.objects.update(
+        favorites_count=count_subquery(Favorite, 'recipe'),
+        in_carts_count=count_subquery(IngredientList, 'recipe'),
+    )
+    User.objects.update(recipes_count=count_subquery(Recipe, 'author'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_recipes_count'),
+        ('recipes', '0005_recipe_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_carts_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='В списках покупок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_card',
+            field=models.ImageField(blank=True, upload_to='back_media/renditions/', verbose_name='Фото блюда (карточка)'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_full',
+            field=models.ImageField(blank=True, upload_to='back_media/renditions/', verbose_name='Фото блюда (крупное)'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, upload_to='back_media/renditions/', verbose_name='Фото блюда (миниатюра)'),
+        ),
+    ]
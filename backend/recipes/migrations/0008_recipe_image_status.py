@@ -0,0 +1,23 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='ready', max_length=10, verbose_name='Статус обработки фото'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='back_media/', verbose_name='Фото блюда'),
+        ),
+    ]
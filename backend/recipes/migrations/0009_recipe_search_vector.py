@@ -0,0 +1,61 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:10
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_SEARCH_INDEX = (
+    '''
+    CREATE FUNCTION recipes_recipe_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.text, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER recipes_recipe_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_vector()
+    ''',
+    'UPDATE recipes_recipe SET name = name',
+    '''
+    CREATE INDEX recipe_search_vector_idx
+    ON recipes_recipe USING gin (search_vector)
+    ''',
+)
+DROP_SEARCH_INDEX = (
+    'DROP INDEX IF EXISTS recipe_search_vector_idx',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_vector_update '
+    'ON recipes_recipe',
+    'DROP FUNCTION IF EXISTS recipes_recipe_search_vector()',
+)
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(CREATE_SEARCH_INDEX),
+            run_on_postgresql(DROP_SEARCH_INDEX),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:11
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_ingredients_count(apps, schema_editor):
+    IngredientInRecipe = apps.get_model('recipes', 'IngredientInRecipe')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.update(ingredients_count=Coalesce(models.Subquery(
+        IngredientInRecipe.objects.filter(
+            recipe=models.OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            total=models.Count('pk')
+        ).values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество ингредиентов'),
+        ),
+        migrations.RunPython(
+            fill_ingredients_count, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='ingredientinrecipe',
+            index=models.Index(fields=['ingredients', 'recipe'], name='ingredient_recipe_idx'),
+        ),
+    ]
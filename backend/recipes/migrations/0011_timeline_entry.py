@@ -0,0 +1,86 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_LIMIT = 200
+
+
+def fill_timeline(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Subscription = apps.get_model('users', 'Subscription')
+    TimelineEntry = apps.get_model('recipes', 'TimelineEntry')
+    for user_id, author_id in Subscription.objects.exclude(
+        author=None
+    ).values_list('user_id', 'author_id').iterator():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(
+                    user_id=user_id,
+                    recipe_id=recipe_id,
+                    author_id=author_id,
+                    pub_date=pub_date,
+                )
+                for recipe_id, pub_date in Recipe.objects.filter(
+                    author_id=author_id
+                ).order_by('-pub_date', '-id').values_list(
+                    'id', 'pub_date'
+                )[:BACKFILL_LIMIT]
+            ),
+            ignore_conflicts=True,
+        )
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0010_recipe_ingredients_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Лента подписок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор рецепта'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='recipes.recipe', verbose_name='Рецепт'),
+        ),
+        migrations.AddField(
+            model_name='timelineentry',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-recipe'], name='timeline_user_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', 'author'], name='timeline_user_author_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_timeline_recipe'),
+        ),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
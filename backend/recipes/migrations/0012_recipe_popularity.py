@@ -0,0 +1,27 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='popularity',
+            field=models.FloatField(default=0, verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='popularity_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Популярность пересчитана'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-popularity', '-id'], name='recipe_popularity_idx'),
+        ),
+    ]
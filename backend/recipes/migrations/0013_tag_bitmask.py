@@ -0,0 +1,50 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+TAG_BITS = 63
+
+
+def fill_tag_bits(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeTag = apps.get_model('recipes', 'RecipeTag')
+    Tag = apps.get_model('recipes', 'Tag')
+    tags = list(Tag.objects.order_by('id'))
+    if len(tags) > TAG_BITS:
+        raise ValueError(f'Tag bitmask supports at most {TAG_BITS} tags')
+    for bit, tag in enumerate(tags):
+        tag.bit = bit
+        tag.save(update_fields=('bit',))
+    masks = {}
+    for recipe_id, bit in RecipeTag.objects.values_list(
+        'recipe_id', 'tag__bit'
+    ).iterator():
+        masks[recipe_id] = masks.get(recipe_id, 0) | 1 << bit
+    for recipe_id, mask in masks.items():
+        Recipe.objects.filter(id=recipe_id).update(tags_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_recipe_popularity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Бит в маске тегов рецепта'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tags_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска тегов'),
+        ),
+        migrations.RunPython(fill_tag_bits, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, unique=True, verbose_name='Бит в маске тегов рецепта'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+CREATE_TRIGRAM_INDEX = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    '''
+    CREATE INDEX ingredient_name_trgm_idx
+    ON recipes_ingredient USING gin (upper(name) gin_trgm_ops)
+    ''',
+)
+DROP_TRIGRAM_INDEX = (
+    'DROP INDEX IF EXISTS ingredient_name_trgm_idx',
+)
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_tag_bitmask'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', '-date_added'], name='favorite_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['date_added'], name='favorite_date_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['name'], name='ingredient_name_prefix_idx', opclasses=('varchar_pattern_ops',)),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientlist',
+            index=models.Index(fields=['user', '-date_added'], name='cart_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientlist',
+            index=models.Index(fields=['date_added'], name='cart_date_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-id'], name='recipe_author_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('popularity_updated_at__isnull', False)), fields=['popularity_updated_at'], name='recipe_popularity_updated_idx'),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(CREATE_TRIGRAM_INDEX),
+            run_on_postgresql(DROP_TRIGRAM_INDEX),
+        ),
+    ]
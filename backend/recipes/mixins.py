@@ -0,0 +1,113 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from foodgram.db_router import replica_may_lag
+
+from .models import Tag
+from .versions import get_versions
+
+RECIPE_LIST_CACHE_KEY = 'recipe-list:{}'
+
+
+def recipe_list_version_names(recipe_id, author_id):
+    return ['recipe', f'author:{author_id}', *(
+        f'tag:{slug}'
+        for slug in Tag.objects.filter(
+            recipe=recipe_id
+        ).values_list('slug', flat=True)
+    )]
+
+
+class ConditionalGetMixin:
+    version_names = ()
+
+    def get_version_names(self, request):
+        names = list(self.version_names)
+        if request.user.is_authenticated:
+            names.append(f'relations:{request.user.id}')
+        return names
+
+    def conditional(self, request, render, *args, **kwargs):
+        versions = get_versions(*self.get_version_names(request))
+        if replica_may_lag(max(versions.values())):
+            response = render(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True)
+            return response
+        etag = '"{}"'.format(hashlib.sha1(json.dumps((
+            request.get_full_path(),
+            request.user.id,
+            sorted(versions.items()),
+        )).encode()).hexdigest())
+        last_modified = int(max(versions.values()))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = render(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(
+                    response, public=True,
+                    max_age=settings.HTTP_CACHE_MAX_AGE
+                )
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, super().retrieve, *args, **kwargs)
+
+
+class AnonymousListCacheMixin:
+    def get_list_version_names(self, request):
+        names = ['tag', 'ingredient', 'authors']
+        author = request.query_params.get('author')
+        tags = request.query_params.getlist('tags')
+        if author:
+            names.append(f'author:{author}')
+        elif tags:
+            names.extend(f'tag:{slug}' for slug in tags)
+        else:
+            names.append('recipe')
+        return names
+
+    def get_list_cache_key(self, request, versions):
+        return RECIPE_LIST_CACHE_KEY.format(hashlib.sha1(json.dumps((
+            request.get_host(),
+            sorted(
+                (key, sorted(request.query_params.getlist(key)))
+                for key in request.query_params
+            ),
+            sorted(versions.items()),
+        )).encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        cache = caches[settings.RESPONSE_CACHE]
+        versions = get_versions(*self.get_list_version_names(request))
+        key = self.get_list_cache_key(request, versions)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and not replica_may_lag(max(versions.values()))
+        ):
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -1,12 +1,26 @@
 from colorfield.fields import ColorField
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Cast, NullIf, RowNumber
 
 from users.models import User
 
 COOKING_TIME_ERROR = 'Время приготовление должно быть больше 0!'
 AMOUNT_INGREDIENT_ERROR = 'Количество ингредиента должно быть больше 0!'
+TAG_LIMIT_ERROR = 'Нельзя создать больше {} тегов!'
+
+TAG_BITS = 63
+
+
+def tags_mask(bits):
+    return sum(1 << bit for bit in bits)
+
+
+def free_tag_bits():
+    used = set(Tag.objects.values_list('bit', flat=True))
+    return [bit for bit in range(TAG_BITS) if bit not in used]
 
 
 class Tag(models.Model):
@@ -22,6 +36,11 @@ class Tag(models.Model):
         unique=True,
         verbose_name='Уникальный идентификатор тега'
     )
+    bit = models.PositiveSmallIntegerField(
+        unique=True,
+        editable=False,
+        verbose_name='Бит в маске тегов рецепта'
+    )
 
     class Meta:
         verbose_name = 'Тег'
@@ -45,12 +64,83 @@ class Ingredient(models.Model):
         ordering = ('-pk',)
         verbose_name = 'Ингридиент',
         verbose_name_plural = 'Ингридиенты'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('name', 'measurement_unit'),
+                name='unique_measured_ingredient'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('name',), name='ingredient_name_prefix_idx',
+                opclasses=('varchar_pattern_ops',)
+            ),
+        )
 
     def __str__(self):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def latest_by_author(self, limit):
+        ranked = self.annotate(author_rank=models.Window(
+            expression=RowNumber(),
+            partition_by=models.F('author_id'),
+            order_by=(models.F('pub_date').desc(), models.F('id').desc()),
+        ))
+        sql, params = ranked.query.sql_with_params()
+        return self.model.objects.raw(
+            f'SELECT * FROM ({sql}) AS ranked '
+            f'WHERE ranked.author_rank <= %s',
+            (*params, limit),
+            using=self.db,
+        )
+
+    def cookable(self, ingredient_ids):
+        return self.filter(
+            recipe_ingredients__ingredients__in=ingredient_ids
+        ).annotate(
+            matched=models.Count('recipe_ingredients', distinct=True),
+        ).annotate(
+            missing=models.F('ingredients_count') - models.F('matched'),
+            coverage=Cast('matched', models.FloatField()) / NullIf(
+                'ingredients_count', 0
+            ),
+        ).order_by('-coverage', 'missing', '-pub_date', '-id')
+
+    def with_tags(self, tags, match_all=False):
+        mask = tags_mask(tag.bit for tag in tags)
+        queryset = self.alias(tag_bits=models.F('tags_mask').bitand(mask))
+        if match_all:
+            return queryset.filter(tag_bits=mask)
+        return queryset.exclude(tag_bits=0)
+
+    def with_related(self):
+        return self.defer('search_vector').select_related(
+            'author'
+        ).prefetch_related(
+            'tags',
+            models.Prefetch(
+                'recipe_ingredients',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredients'
+                ),
+            ),
+        )
+
+
 class Recipe(models.Model):
+
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+
+    IMAGE_STATUS = (
+        (IMAGE_PENDING, 'Обрабатывается'),
+        (IMAGE_READY, 'Готово'),
+        (IMAGE_FAILED, 'Ошибка обработки'),
+    )
+
     author = models.ForeignKey(
         User,
         related_name='recipe',
@@ -68,8 +158,30 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='back_media/',
+        blank=True,
         verbose_name='Фото блюда'
     )
+    image_status = models.CharField(
+        max_length=10,
+        choices=IMAGE_STATUS,
+        default=IMAGE_READY,
+        verbose_name='Статус обработки фото'
+    )
+    image_full = models.ImageField(
+        upload_to='back_media/renditions/',
+        blank=True,
+        verbose_name='Фото блюда (крупное)'
+    )
+    image_card = models.ImageField(
+        upload_to='back_media/renditions/',
+        blank=True,
+        verbose_name='Фото блюда (карточка)'
+    )
+    image_thumbnail = models.ImageField(
+        upload_to='back_media/renditions/',
+        blank=True,
+        verbose_name='Фото блюда (миниатюра)'
+    )
     text = models.TextField(
         verbose_name='Описание',
         help_text='Заполните описание рецепта'
@@ -91,11 +203,64 @@ class Recipe(models.Model):
         validators=(MinValueValidator(1, COOKING_TIME_ERROR),),
         verbose_name='Время приготовления',
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='В списках покупок'
+    )
+    ingredients_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество ингредиентов'
+    )
+    tags_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Маска тегов'
+    )
+    popularity = models.FloatField(
+        default=0,
+        verbose_name='Популярность'
+    )
+    popularity_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Популярность пересчитана'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'), name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='recipe_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-popularity', '-id'), name='recipe_popularity_idx'
+            ),
+            models.Index(
+                fields=('author', '-id'), name='recipe_author_id_idx'
+            ),
+            models.Index(
+                fields=('popularity_updated_at',),
+                name='recipe_popularity_updated_idx',
+                condition=models.Q(popularity_updated_at__isnull=False)
+            ),
+        )
 
     def __str__(self):
         return f'({self.name} от {self.author.username})'
@@ -149,6 +314,12 @@ class IngredientInRecipe(models.Model):
                 fields=('recipe', 'ingredients'), name='unique_ingredient'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('ingredients', 'recipe'),
+                name='ingredient_recipe_idx'
+            ),
+        )
 
     def __str__(self):
         return self.ingredients.name
@@ -178,6 +349,14 @@ class Favorite(models.Model):
                 name='favorite_recipe'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('user', '-date_added'), name='favorite_user_date_idx'
+            ),
+            models.Index(
+                fields=('date_added',), name='favorite_date_added_idx'
+            ),
+        )
 
     def __str__(self):
         return (f'({self.recipe.name} от {self.user.username})')
@@ -209,3 +388,53 @@ class IngredientList(models.Model):
                 fields=('user', 'recipe'), name='unique_list'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('user', '-date_added'), name='cart_user_date_idx'
+            ),
+            models.Index(
+                fields=('date_added',), name='cart_date_added_idx'
+            ),
+        )
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Рецепт'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор рецепта'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_timeline_recipe'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-recipe'),
+                name='timeline_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=('user', 'author'), name='timeline_user_author_idx'
+            ),
+        )
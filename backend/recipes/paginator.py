@@ -1,5 +1,119 @@
-from rest_framework.pagination import PageNumberPagination
+import heapq
+
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor, CursorPagination, PageNumberPagination,
+)
+from rest_framework.response import Response
+
+
+class RecipesCursorPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    ordering = ('-pub_date', '-id')
+    orderings = (('-pub_date', '-id'), ('-popularity', '-id'))
 
 
 class RecipesPagination(PageNumberPagination):
     page_size_query_param = "limit"
+    pagination_query_param = 'pagination'
+    cursor_pagination_class = RecipesCursorPagination
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def get_cursor_ordering(self, queryset, view):
+        default = (
+            getattr(view, 'cursor_ordering', None)
+            or self.cursor_pagination_class.ordering
+        )
+        view_queryset = getattr(view, 'queryset', None)
+        view_ordering = (
+            tuple(view_queryset.query.order_by)
+            if view_queryset is not None else ()
+        )
+        ordering = tuple(queryset.query.order_by)
+        if ordering in ((), view_ordering, tuple(default)):
+            return default
+        if ordering in self.cursor_pagination_class.orderings:
+            return ordering
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        ordering = None
+        if self.use_cursor(request):
+            ordering = self.get_cursor_ordering(queryset, view)
+        if ordering is None:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = self.cursor_pagination_class()
+        self.cursor_paginator.ordering = ordering
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class FeedPagination(RecipesCursorPagination):
+    def decode_position(self, request):
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            return None
+        if self.cursor.position is None:
+            raise NotFound(self.invalid_cursor_message)
+        pub_date, _, pk = self.cursor.position.rpartition('|')
+        pub_date = parse_datetime(pub_date)
+        if pub_date is None or not pk.isdecimal():
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, int(pk)
+
+    def paginate_sources(self, sources, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position = self.decode_position(request)
+        pages = []
+        for queryset, field in sources:
+            if position is not None:
+                pub_date, pk = position
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date)
+                    | Q(pub_date=pub_date, **{f'{field}__lt': pk})
+                )
+            pages.append(queryset.order_by(
+                '-pub_date', f'-{field}'
+            ).values_list('pub_date', field)[:self.page_size + 1])
+        rows = []
+        for row in heapq.merge(*pages, reverse=True):
+            if not rows or rows[-1] != row:
+                rows.append(row)
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = rows[-1] if self.has_next else None
+        return [pk for _, pk in rows]
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        pub_date, pk = self.next_position
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False, position=f'{pub_date.isoformat()}|{pk}'
+        ))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        )))
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Max, Q, Value, When
+from django.utils import timezone
+
+from .models import Favorite, IngredientList, Recipe
+from .versions import bump_versions
+
+POPULARITY_EVENTS = (
+    (Favorite, 'favorite'),
+    (IngredientList, 'shopping_cart'),
+)
+
+
+def decay(seconds):
+    return 0.5 ** (seconds / settings.POPULARITY_HALF_LIFE.total_seconds())
+
+
+def stale_recipes():
+    return Recipe.objects.filter(
+        popularity__gt=0, popularity_updated_at__isnull=True
+    )
+
+
+def collect_scores(since, now, stale=()):
+    scores = defaultdict(float)
+    for model, event in POPULARITY_EVENTS:
+        weight = settings.POPULARITY_WEIGHTS[event]
+        events = model.objects.filter(date_added__lte=now)
+        if since is not None:
+            events = events.filter(
+                Q(date_added__gt=since) | Q(recipe_id__in=stale)
+            )
+        for recipe_id, date_added in events.values_list(
+            'recipe_id', 'date_added'
+        ).iterator():
+            scores[recipe_id] += weight * decay(
+                (now - date_added).total_seconds()
+            )
+    return scores
+
+
+def add_scores(scores, now, batch_size):
+    items = iter(scores.items())
+    updated = 0
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            return updated
+        updated += Recipe.objects.filter(
+            id__in=[recipe_id for recipe_id, _ in batch]
+        ).update(
+            popularity=F('popularity') + Case(
+                *[
+                    When(id=recipe_id, then=Value(score))
+                    for recipe_id, score in batch
+                ],
+                output_field=FloatField(),
+            ),
+            popularity_updated_at=now,
+        )
+
+
+@transaction.atomic
+def update_popularity(full=False, batch_size=500):
+    now = timezone.now()
+    since = None
+    if not full:
+        since = Recipe.objects.aggregate(
+            since=Max('popularity_updated_at')
+        )['since']
+    if since is None:
+        Recipe.objects.exclude(popularity=0).update(
+            popularity=0, popularity_updated_at=None
+        )
+        stale = []
+    else:
+        stale = list(stale_recipes().values_list('id', flat=True))
+        Recipe.objects.filter(id__in=stale).update(popularity=0)
+        Recipe.objects.filter(popularity__gt=0).update(
+            popularity=F('popularity') * decay(
+                (now - since).total_seconds()
+            ),
+            popularity_updated_at=now,
+        )
+    scores = collect_scores(since, now, stale)
+    updated = add_scores(scores, now, batch_size)
+    transaction.on_commit(lambda: bump_versions('popularity'))
+    return updated
@@ -0,0 +1,62 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from foodgram.db_router import use_primary
+from users.models import Subscription
+
+from .models import Favorite, IngredientList
+from .versions import bump_versions
+
+RELATIONS_CACHE_KEY = 'relations:{}'
+
+UserRelations = namedtuple(
+    'UserRelations', ('favorites', 'shopping_cart', 'subscriptions')
+)
+EMPTY_RELATIONS = UserRelations(frozenset(), frozenset(), frozenset())
+
+
+def get_cache():
+    return caches[settings.RELATIONS_CACHE]
+
+
+def load_relations(user):
+    return UserRelations(
+        favorites=frozenset(Favorite.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True)),
+        shopping_cart=frozenset(IngredientList.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True)),
+        subscriptions=frozenset(Subscription.objects.filter(
+            user=user
+        ).values_list('author_id', flat=True)),
+    )
+
+
+def get_user_relations(user):
+    if user.is_anonymous:
+        return EMPTY_RELATIONS
+    key = RELATIONS_CACHE_KEY.format(user.id)
+    relations = get_cache().get(key)
+    if relations is None:
+        with use_primary():
+            relations = load_relations(user)
+        get_cache().set(key, relations, settings.RELATIONS_CACHE_TIMEOUT)
+    return relations
+
+
+def get_relations(request):
+    if request is None:
+        return EMPTY_RELATIONS
+    relations = getattr(request, '_user_relations', None)
+    if relations is None:
+        relations = get_user_relations(request.user)
+        request._user_relations = relations
+    return relations
+
+
+def invalidate_relations(user_id):
+    get_cache().delete(RELATIONS_CACHE_KEY.format(user_id))
+    bump_versions(f'relations:{user_id}')
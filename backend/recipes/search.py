@@ -0,0 +1,174 @@
+import bisect
+import re
+import threading
+import time
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, When
+
+from .models import Ingredient, Recipe
+
+WORD = re.compile(r'\w+')
+RUSSIAN_ENDINGS = sorted((
+    'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ая', 'яя',
+    'ое', 'ее', 'ые', 'ие', 'ый', 'ий', 'ой', 'ом', 'ем', 'ам', 'ям', 'ах',
+    'ях', 'ую', 'юю', 'ов', 'ев', 'ей', 'ью', 'ия', 'ть', 'ет', 'ут', 'ют',
+    'ит', 'ат', 'ят', 'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+), key=len, reverse=True)
+NAME_WEIGHT = 1.0
+TEXT_WEIGHT = 0.4
+
+
+class IngredientIndex:
+    def __init__(self, ttl=settings.INGREDIENT_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keys = None
+        self._items = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+            self._items = None
+
+    def build(self):
+        rows = sorted(
+            (name.lower(), name, pk, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            ).iterator()
+        )
+        keys = [row[0] for row in rows]
+        items = [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, name, pk, measurement_unit in rows
+        ]
+        with self._lock:
+            self._keys, self._items = keys, items
+            self._built_at = time.monotonic()
+        return keys, items
+
+    def _snapshot(self):
+        with self._lock:
+            keys, items = self._keys, self._items
+            expired = time.monotonic() - self._built_at > self.ttl
+        if keys is None or expired:
+            keys, items = self.build()
+        return keys, items
+
+    def search(self, query, limit=None):
+        keys, items = self._snapshot()
+        query = query.lower()
+        start = bisect.bisect_left(keys, query)
+        end = bisect.bisect_right(keys, query + chr(0x10ffff), lo=start)
+        exact, prefix = [], []
+        for position in range(start, end):
+            if keys[position] == query:
+                exact.append(items[position])
+            else:
+                prefix.append(items[position])
+        result = exact + prefix
+        if limit is None or len(result) < limit:
+            result += [
+                items[position]
+                for position in range(len(keys))
+                if not start <= position < end and query in keys[position]
+            ]
+        return result[:limit]
+
+
+ingredient_index = IngredientIndex()
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    for ending in RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD.findall(text or '')]
+
+
+class RecipeIndex:
+    def __init__(self, ttl=settings.RECIPE_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._terms = None
+        self._postings = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._terms = None
+            self._postings = None
+
+    def build(self):
+        postings = defaultdict(lambda: defaultdict(float))
+        for pk, name, text in Recipe.objects.values_list(
+            'id', 'name', 'text'
+        ).iterator():
+            for term in tokenize(name):
+                postings[term][pk] += NAME_WEIGHT
+            for term in tokenize(text):
+                postings[term][pk] += TEXT_WEIGHT
+        terms = sorted(postings)
+        postings = {term: dict(scores) for term, scores in postings.items()}
+        with self._lock:
+            self._terms, self._postings = terms, postings
+            self._built_at = time.monotonic()
+        return terms, postings
+
+    def _snapshot(self):
+        with self._lock:
+            terms, postings = self._terms, self._postings
+            expired = time.monotonic() - self._built_at > self.ttl
+        if terms is None or expired:
+            terms, postings = self.build()
+        return terms, postings
+
+    def search(self, query):
+        terms, postings = self._snapshot()
+        scores = None
+        for word in set(tokenize(query)):
+            matches = defaultdict(float)
+            start = bisect.bisect_left(terms, word)
+            end = bisect.bisect_right(terms, word + chr(0x10ffff), lo=start)
+            for term in terms[start:end]:
+                for pk, weight in postings[term].items():
+                    matches[pk] += weight
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    pk: score + matches[pk]
+                    for pk, score in scores.items() if pk in matches
+                }
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
+
+
+recipe_index = RecipeIndex()
+
+
+def search_recipes(queryset, value):
+    if connections[queryset.db].vendor == 'postgresql':
+        query = SearchQuery(value, config='russian', search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-pub_date', '-id')
+    ids = recipe_index.search(value)
+    return queryset.filter(pk__in=ids).order_by(Case(
+        *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    ))
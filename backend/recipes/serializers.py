@@ -1,11 +1,19 @@
-from drf_extra_fields.fields import Base64ImageField
+from django.db import connection, transaction
 from rest_framework import serializers
 
 from users.models import User
 from users.serializers import UserDetailSerializer
+from .counters import change_counter
+from .fields import Base64ImageUploadField, RecipeImageField
+from .images import IMAGE_FIELDS
+from .mixins import recipe_list_version_names
 from .models import (
-    Favorite, Ingredient, IngredientInRecipe, IngredientList, Recipe, Tag,
+    Favorite, Ingredient, IngredientInRecipe, IngredientList, Recipe,
+    RecipeTag, Tag, tags_mask,
 )
+from .relations import get_relations
+from .tasks import schedule_image
+from .versions import bump_versions
 
 INGREDIENT_VALIDATION_ERROR = 'Добавте хотябы один ингредиент'
 UNIQUE_INGREDIENT_ERROR = 'Ингредиент уже в рецепте!'
@@ -13,6 +21,8 @@ AMOUNT_VALIDATION_ERROR = 'Ингредиента должно быть боль
 COOKING_TIME_VALIDATION_ERROR = 'Время приготовления должно быть больше 0!'
 TAG_VALIDATION_ERROR = 'Добавте тег!'
 UNIQUE_TAG_ERROR = 'Тег должен быть уникальным!'
+INGREDIENT_NOT_FOUND_ERROR = 'Ингредиент не найден!'
+TAG_NOT_FOUND_ERROR = 'Тег не найден!'
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -53,7 +63,7 @@ class IngredientsInRecipesSerializer(serializers.ModelSerializer):
 
 
 class IngredientsInRecipesPostSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(write_only=True)
 
     class Meta:
@@ -70,6 +80,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     author = UserDetailSerializer()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image = RecipeImageField(rendition='full')
 
     class Meta:
         model = Recipe
@@ -82,38 +93,41 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_status',
             'text',
             'cooking_time'
         )
 
     def get_ingredients(self, obj):
-        queryset = IngredientInRecipe.objects.filter(recipe=obj)
+        queryset = obj.recipe_ingredients.all()
         return IngredientsInRecipesSerializer(queryset, many=True).data
 
     def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request.user.is_anonymous:
-            return False
-        return Favorite.objects.filter(
-            user=request.user, recipe_id=obj.id
-        ).exists()
+        relations = get_relations(self.context.get('request'))
+        return obj.id in relations.favorites
 
     def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if request.user.is_anonymous:
-            return False
-        return IngredientList.objects.filter(
-            user=request.user, recipe=obj
-        ).exists()
+        relations = get_relations(self.context.get('request'))
+        return obj.id in relations.shopping_cart
+
+
+class RecipeListSerializer(RecipeSerializer):
+    image = RecipeImageField(rendition='card')
+
+
+class RecipeCoverageSerializer(RecipeListSerializer):
+    coverage = serializers.FloatField(read_only=True)
+    missing = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + ('coverage', 'missing')
 
 
 class RecipePostSerializer(serializers.ModelSerializer):
     author = UserDetailSerializer(read_only=True)
     ingredients = IngredientsInRecipesPostSerializer(many=True)
-    image = Base64ImageField()
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Tag.objects.all()
-    )
+    image = Base64ImageUploadField()
+    tags = serializers.ListField(child=serializers.IntegerField())
 
     class Meta:
         model = Recipe
@@ -154,57 +168,135 @@ class RecipePostSerializer(serializers.ModelSerializer):
             )
         return data
 
-    def validate_tag(self, data):
-        tags = self.initial_data.get('tags')
-        if tags is None:
-            raise serializers.ValidationError(
-                TAG_VALIDATION_ERROR
-            )
-        tags_list = len(tags)
-        tags_set = len(
-            set([tag['id'] for tag in tags])
-        )
-        if tags_list > tags_set:
+    def validate_ingredients(self, ingredients):
+        ids = {ingredient['id'] for ingredient in ingredients}
+        if Ingredient.objects.filter(id__in=ids).count() < len(ids):
+            raise serializers.ValidationError(INGREDIENT_NOT_FOUND_ERROR)
+        return ingredients
+
+    def validate_tags(self, tags):
+        if not tags:
+            raise serializers.ValidationError(TAG_VALIDATION_ERROR)
+        if len(tags) > len(set(tags)):
             raise serializers.ValidationError(UNIQUE_TAG_ERROR)
-        return data
+        if Tag.objects.filter(id__in=tags).count() < len(tags):
+            raise serializers.ValidationError(TAG_NOT_FOUND_ERROR)
+        return tags
 
     def add_ingredients(self, ingredients, recipe):
-        for ingredient in ingredients:
-            item = ingredient['id']
-            amount = ingredient['amount']
-            IngredientInRecipe.objects.create(
-                ingredients=item,
+        change_counter(
+            Recipe.objects.filter(id=recipe.id),
+            'ingredients_count', len(ingredients)
+        )
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(
+                ingredients_id=ingredient['id'],
                 recipe=recipe,
-                amount=amount
+                amount=ingredient['amount']
+            )
+            for ingredient in ingredients
+        ])
+
+    def delete_ingredients(self, ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM {} WHERE id IN ({})'.format(
+                    connection.ops.quote_name(
+                        IngredientInRecipe._meta.db_table
+                    ),
+                    ', '.join(['%s'] * len(ids))
+                ),
+                ids
             )
 
+    def update_ingredients(self, ingredients, recipe):
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        current = {
+            item.ingredients_id: item
+            for item in recipe.recipe_ingredients.all()
+        }
+        removed = current.keys() - amounts.keys()
+        if removed:
+            self.delete_ingredients([current[key].id for key in removed])
+            change_counter(
+                Recipe.objects.filter(id=recipe.id),
+                'ingredients_count', -len(removed)
+            )
+        changed = []
+        for ingredient_id, item in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and item.amount != amount:
+                item.amount = amount
+                changed.append(item)
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ('amount',))
+        self.add_ingredients(
+            [
+                ingredient for ingredient in ingredients
+                if ingredient['id'] not in current
+            ],
+            recipe
+        )
+
+    def get_tags_mask(self, tags):
+        return tags_mask(
+            Tag.objects.filter(id__in=tags).values_list('bit', flat=True)
+        )
+
+    def add_tags(self, tags, recipe):
+        RecipeTag.objects.bulk_create(
+            [RecipeTag(recipe=recipe, tag_id=tag) for tag in tags]
+        )
+        names = recipe_list_version_names(recipe.id, recipe.author_id)
+        transaction.on_commit(lambda: bump_versions(*names))
+
+    @transaction.atomic
     def create(self, validate_data):
         tags = validate_data.pop('tags')
         ingredient = validate_data.pop('ingredients')
-        recipe = Recipe.objects.create(
-            author=self.context['request'].user, **validate_data
+        image = validate_data.pop('image')
+        recipe = Recipe(
+            author=self.context['request'].user,
+            tags_mask=self.get_tags_mask(tags),
+            **validate_data
         )
-        recipe.tags.set(tags)
+        schedule_image(recipe, image)
+        recipe.save()
+        self.add_tags(tags, recipe)
         self.add_ingredients(ingredient, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        tags = self.context['request'].data['tags']
-        instance.tags.set(tags)
-        instance.name = validated_data.get('name', instance.image)
+        update_fields = ['name', 'text', 'cooking_time']
+        if 'tags' in validated_data:
+            tags = validated_data.pop('tags')
+            instance.tags.set(tags)
+            instance.tags_mask = self.get_tags_mask(tags)
+            update_fields.append('tags_mask')
+        instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
         instance.cooking_time = validated_data.get(
             'cooking_time',
             instance.cooking_time
         )
-        instance.image = validated_data.get('image', instance.image)
-        if 'ingredients' in self.initial_data:
-            ingredients = validated_data.pop('ingredients')
-            instance.ingredients.clear()
-            self.add_ingredients(ingredients, instance)
-        instance.save()
+        if 'image' in validated_data:
+            schedule_image(instance, validated_data.pop('image'))
+            update_fields.extend(('image_status', *IMAGE_FIELDS))
+        if 'ingredients' in validated_data:
+            self.update_ingredients(
+                validated_data.pop('ingredients'), instance
+            )
+        instance.save(update_fields=update_fields)
         return instance
 
+    def to_representation(self, instance):
+        instance = Recipe.objects.with_related().get(pk=instance.pk)
+        return RecipeSerializer(instance, context=self.context).data
+
 
 class FavoriteRecipesSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(
@@ -0,0 +1,202 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from users.models import Subscription, User
+
+from .counters import change_counter
+from .feed import backfill_timeline, prune_timeline, push_recipe
+from .mixins import recipe_list_version_names
+from .models import (
+    TAG_BITS, TAG_LIMIT_ERROR, Favorite, Ingredient, IngredientInRecipe,
+    IngredientList, Recipe, RecipeTag, Tag, free_tag_bits, tags_mask,
+)
+from .relations import invalidate_relations
+from .search import ingredient_index, recipe_index
+from .tasks import submit_on_commit
+from .versions import bump_versions
+
+MODEL_VERSIONS = {
+    Tag: 'tag',
+    Ingredient: 'ingredient',
+    Recipe: 'recipe',
+    RecipeTag: 'recipe',
+    IngredientInRecipe: 'recipe',
+    User: 'user',
+}
+USER_HIDDEN_FIELDS = {'last_login', 'password'}
+
+
+def user_visible_change(update_fields):
+    return not update_fields or not set(update_fields) <= USER_HIDDEN_FIELDS
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe_index(sender, update_fields=None, **kwargs):
+    if update_fields and not {'name', 'text'} & set(update_fields):
+        return
+    recipe_index.invalidate()
+
+
+@receiver((post_save, post_delete))
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_model_version(sender, update_fields=None, **kwargs):
+    name = MODEL_VERSIONS.get(sender)
+    if sender is User and not user_visible_change(update_fields):
+        return
+    if name is not None:
+        transaction.on_commit(lambda: bump_versions(name))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(pre_delete, sender=Recipe)
+def bump_recipe_lists(sender, instance, **kwargs):
+    names = recipe_list_version_names(instance.id, instance.author_id)
+    transaction.on_commit(lambda: bump_versions(*names))
+
+
+@receiver((post_save, post_delete), sender=RecipeTag)
+@receiver((post_save, post_delete), sender=IngredientInRecipe)
+def bump_recipe_lists_for_relation(sender, instance, **kwargs):
+    bump_recipe_lists(Recipe, instance.recipe)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipe_lists_for_tags(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    names = recipe_list_version_names(instance.id, instance.author_id)
+    if pk_set:
+        names += [
+            f'tag:{slug}'
+            for slug in Tag.objects.filter(
+                id__in=pk_set
+            ).values_list('slug', flat=True)
+        ]
+    transaction.on_commit(lambda: bump_versions(*names))
+
+
+@receiver(post_save, sender=User)
+def bump_author_lists(sender, instance, update_fields=None, **kwargs):
+    if instance.recipes_count and user_visible_change(update_fields):
+        bump_versions('authors')
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=IngredientList)
+@receiver((post_save, post_delete), sender=Subscription)
+def invalidate_user_relations(sender, instance, **kwargs):
+    invalidate_relations(instance.user_id)
+
+
+def counter_delta(signal, created=False, **kwargs):
+    if signal is post_delete:
+        return -1
+    return 1 if created else 0
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+def count_favorites(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        'favorites_count', counter_delta(**kwargs)
+    )
+
+
+@receiver((post_save, post_delete), sender=IngredientList)
+def count_carts(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        'in_carts_count', counter_delta(**kwargs)
+    )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=IngredientList)
+def mark_popularity_stale(sender, instance, **kwargs):
+    Recipe.objects.filter(
+        id=instance.recipe_id, popularity__gt=0
+    ).update(popularity_updated_at=None)
+
+
+@receiver((post_save, post_delete), sender=IngredientInRecipe)
+def count_ingredients(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(id=instance.recipe_id),
+        'ingredients_count', counter_delta(**kwargs)
+    )
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def count_recipes(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(pk=instance.author_id),
+        'recipes_count', counter_delta(**kwargs)
+    )
+
+
+@receiver((post_save, post_delete), sender=Subscription)
+def count_followers(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(id=instance.author_id),
+        'followers_count', counter_delta(**kwargs)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(sender, instance, created, **kwargs):
+    if created:
+        submit_on_commit(push_recipe, instance.id)
+
+
+@receiver(post_save, sender=Subscription)
+def fill_timeline(sender, instance, created, **kwargs):
+    if created and instance.author_id is not None:
+        backfill_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def clear_timeline(sender, instance, **kwargs):
+    if instance.author_id is not None:
+        prune_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(pre_save, sender=Tag)
+def assign_tag_bit(sender, instance, **kwargs):
+    if instance.bit is not None:
+        return
+    free = free_tag_bits()
+    if not free:
+        raise ValidationError(TAG_LIMIT_ERROR.format(TAG_BITS))
+    instance.bit = free[0]
+
+
+def update_tags_mask(recipe_id):
+    Recipe.objects.filter(id=recipe_id).update(tags_mask=tags_mask(
+        Tag.objects.filter(recipe=recipe_id).values_list('bit', flat=True)
+    ))
+
+
+@receiver((post_save, post_delete), sender=RecipeTag)
+def sync_tags_mask(sender, instance, **kwargs):
+    update_tags_mask(instance.recipe_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def sync_tags_mask_for_tags(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_tags_mask(instance.id)
+        return
+    for recipe_id in pk_set or ():
+        update_tags_mask(recipe_id)
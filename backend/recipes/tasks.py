@@ -0,0 +1,64 @@
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .images import delete_images, render_image, replace_image
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+executor = None
+
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_WORKERS,
+            thread_name_prefix='foodgram-tasks'
+        )
+    return executor
+
+
+def run_in_worker(task, *args):
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Background task %s failed', task.__name__)
+    finally:
+        connection.close()
+
+
+def submit(task, *args):
+    if settings.BACKGROUND_WORKERS:
+        get_executor().submit(run_in_worker, task, *args)
+    else:
+        task(*args)
+
+
+def submit_on_commit(task, *args):
+    transaction.on_commit(lambda: submit(task, *args))
+
+
+def process_image(recipe_id):
+    recipe = Recipe.objects.filter(id=recipe_id).first()
+    if recipe is None or not recipe.image:
+        return
+    try:
+        render_image(recipe)
+    except Exception:
+        logger.exception('Recipe %s image processing failed', recipe_id)
+        Recipe.objects.filter(id=recipe_id).update(
+            image_status=Recipe.IMAGE_FAILED
+        )
+
+
+def schedule_image(recipe, image):
+    stale = replace_image(recipe, image)
+    recipe.image_status = Recipe.IMAGE_PENDING
+    if stale:
+        submit_on_commit(delete_images, stale)
+    transaction.on_commit(lambda: submit(process_image, recipe.id))
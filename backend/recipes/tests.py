@@ -0,0 +1,222 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from users.authentication import token_cache
+from users.models import Subscription, User
+
+from .models import (
+    Favorite, Ingredient, IngredientInRecipe, IngredientList, Recipe, Tag,
+)
+from .popularity import update_popularity
+
+RECIPE_IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAgMAAABieywaAAAA'
+    'CVBMVEUAAAD///9fX1/S0ecCAAAACXBIWXMAAA7EAAAOxAGVKw4bAAAACklEQVQImWNoAA'
+    'AAggCByxOyYQAAAABJRU5ErkJggg=='
+)
+
+
+class QueryCountTestCase(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        for cache in caches.all():
+            cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(
+            email='reader@foodgram.local', username='reader',
+            first_name='Reader', last_name='Reader', password='password'
+        )
+        self.client = APIClient(HTTP_AUTHORIZATION='Token {}'.format(
+            Token.objects.create(user=self.user).key
+        ))
+        self.tags = [
+            Tag.objects.create(
+                name=f'Тег {number}', slug=f'tag-{number}', color='#E26C2D'
+            )
+            for number in range(3)
+        ]
+        self.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(30)
+        ]
+
+    def count_queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(
+                url, format='json', **kwargs
+            )
+        self.assertLess(response.status_code, 300, response.content)
+        return len(queries)
+
+
+class RecipeListQueriesTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        for number in range(12):
+            author = User.objects.create_user(
+                email=f'author{number}@foodgram.local',
+                username=f'author{number}', first_name='Author',
+                last_name=str(number), password='password'
+            )
+            recipe = Recipe.objects.create(
+                author=author, name=f'Рецепт {number}', text='Текст',
+                image='recipes/recipe.png', cooking_time=10
+            )
+            recipe.tags.set(self.tags[:number % 3 + 1])
+            IngredientInRecipe.objects.bulk_create(
+                IngredientInRecipe(
+                    recipe=recipe, ingredients=ingredient, amount=100
+                )
+                for ingredient in self.ingredients[:number + 1]
+            )
+            if number % 2:
+                Favorite.objects.create(user=self.user, recipe=recipe)
+                Subscription.objects.create(user=self.user, author=author)
+            if number % 3:
+                IngredientList.objects.create(user=self.user, recipe=recipe)
+
+    def test_page_query_count_does_not_depend_on_page_size(self):
+        self.count_queries('get', '/api/recipes/?limit=1')
+        small = self.count_queries('get', '/api/recipes/?limit=2')
+        large = self.count_queries('get', '/api/recipes/?limit=12')
+        self.assertEqual(small, large)
+
+    def test_page_query_count(self):
+        self.count_queries('get', '/api/recipes/?limit=1')
+        with self.assertNumQueries(4):
+            self.client.get('/api/recipes/?limit=2')
+        with self.assertNumQueries(4):
+            self.client.get('/api/recipes/?limit=12')
+
+
+class RecipeSaveQueriesTests(QueryCountTestCase):
+    def recipe_data(self, count, offset=0, amount=100):
+        return {
+            'name': 'Рецепт',
+            'text': 'Текст',
+            'cooking_time': 10,
+            'image': RECIPE_IMAGE,
+            'tags': [tag.id for tag in self.tags[:2]],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': amount}
+                for ingredient in self.ingredients[offset:offset + count]
+            ],
+        }
+
+    def create_recipe(self, count):
+        return self.client.post(
+            '/api/recipes/', self.recipe_data(count), format='json'
+        ).data['id']
+
+    def test_create_query_count_does_not_depend_on_ingredients(self):
+        self.count_queries('post', '/api/recipes/', data=self.recipe_data(1))
+        small = self.count_queries(
+            'post', '/api/recipes/', data=self.recipe_data(2)
+        )
+        large = self.count_queries(
+            'post', '/api/recipes/', data=self.recipe_data(30)
+        )
+        self.assertEqual(small, large)
+
+    def test_update_query_count_does_not_depend_on_ingredients(self):
+        small_id = self.create_recipe(4)
+        large_id = self.create_recipe(20)
+        small = self.count_queries(
+            'put', f'/api/recipes/{small_id}/',
+            data=self.recipe_data(4, offset=2, amount=50)
+        )
+        large = self.count_queries(
+            'put', f'/api/recipes/{large_id}/',
+            data=self.recipe_data(20, offset=10, amount=50)
+        )
+        self.assertEqual(small, large)
+        self.assertEqual(
+            Recipe.objects.get(id=large_id).ingredients_count, 20
+        )
+
+
+class RecipeListCacheTests(QueryCountTestCase):
+    def test_create_invalidates_anonymous_tag_list(self):
+        anonymous = APIClient()
+        url = f'/api/recipes/?tags={self.tags[1].slug}'
+        self.assertEqual(anonymous.get(url).data['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe_id = self.client.post('/api/recipes/', {
+                'name': 'Рецепт',
+                'text': 'Текст',
+                'cooking_time': 10,
+                'image': RECIPE_IMAGE,
+                'tags': [self.tags[1].id],
+                'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+            }, format='json').data['id']
+        self.assertEqual(
+            [recipe['id'] for recipe in anonymous.get(url).data['results']],
+            [recipe_id]
+        )
+
+
+class RecipeImageTests(QueryCountTestCase):
+    def recipe_data(self, image):
+        return {
+            'name': 'Рецепт',
+            'text': 'Текст',
+            'cooking_time': 10,
+            'image': image,
+            'tags': [self.tags[0].id],
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 100}],
+        }
+
+    def test_rejects_non_image_upload(self):
+        response = self.client.post(
+            '/api/recipes/', self.recipe_data('aW1hZ2U='), format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.data)
+
+    def test_render_images_processes_pending_upload(self):
+        response = self.client.post(
+            '/api/recipes/', self.recipe_data(RECIPE_IMAGE), format='json'
+        )
+        recipe = Recipe.objects.get(id=response.data['id'])
+        self.assertEqual(recipe.image_status, Recipe.IMAGE_PENDING)
+        self.assertTrue(recipe.image)
+        call_command('render_images', stdout=io.StringIO())
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.image_status, Recipe.IMAGE_READY)
+        self.assertTrue(recipe.image_thumbnail)
+
+
+class PopularityTests(QueryCountTestCase):
+    def test_incremental_update_drops_removed_favorites(self):
+        recipe, other = [
+            Recipe.objects.create(
+                author=self.user, name=f'Рецепт {number}', text='Текст',
+                image='recipes/recipe.png', cooking_time=10
+            )
+            for number in range(2)
+        ]
+        Favorite.objects.create(user=self.user, recipe=recipe)
+        Favorite.objects.create(user=self.user, recipe=other)
+        update_popularity()
+        Favorite.objects.filter(user=self.user, recipe=recipe).delete()
+        Favorite.objects.create(user=self.user, recipe=recipe)
+        update_popularity()
+        recipe.refresh_from_db()
+        other.refresh_from_db()
+        self.assertAlmostEqual(recipe.popularity, 1, places=3)
+        self.assertAlmostEqual(other.popularity, 1, places=3)
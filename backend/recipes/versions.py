@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_CACHE_KEY = 'version:{}'
+
+
+def get_cache():
+    return caches[settings.VERSIONS_CACHE]
+
+
+def get_versions(*names):
+    keys = {VERSION_CACHE_KEY.format(name): name for name in names}
+    versions = get_cache().get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        get_cache().set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions(*names):
+    now = time.time()
+    get_cache().set_many(
+        {VERSION_CACHE_KEY.format(name): now for name in names}, None
+    )
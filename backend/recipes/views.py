@@ -1,4 +1,6 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.db.models import F, Sum
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status
@@ -6,14 +8,21 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from .filters import IngredientFilter, RecipeFilters
+from foodgram.db_router import read_from_primary
+
+from .exporters import EXPORTERS, SHOPPING_CART_FORMATS
+from .feed import get_feed_sources
+from .filters import POPULAR_ORDERING, IngredientFilter, RecipeFilters
+from .mixins import AnonymousListCacheMixin, ConditionalGetMixin
 from .models import (
     Favorite, Ingredient, IngredientInRecipe, IngredientList, Recipe, Tag,
 )
-from .paginator import RecipesPagination
+from .paginator import FeedPagination, RecipesPagination
+from .search import ingredient_index
 from .serializers import (
     FavoriteRecipesSerializer, IngredientListSerializer, IngredientSerializer,
-    RecipePostSerializer, RecipeSerializer, TagSerializer,
+    RecipeCoverageSerializer, RecipeListSerializer, RecipePostSerializer,
+    RecipeSerializer, TagSerializer,
 )
 
 FAVORITE_CREATE_MESSAGE = 'Рецепт успешно добавлен в избранное'
@@ -22,32 +31,75 @@ FAVORITE_DELETE_MESSAGE = 'Рецепт удалён из избранного'
 SHOPPING_CART_ADD_MESSAGE = 'Рецепт успешно добавлен в корзину'
 SHOPPING_CART_ERROR_MESSAGE = 'Рецепта нет в списке покупок'
 SHOPPING_CART_DELETE_MESSAGE = 'Рецепт успешно удален из списка покупок'
+SHOPPING_CART_FORMAT_ERROR = 'Неизвестный формат списка покупок'
+COOK_INGREDIENTS_ERROR = 'Укажите id ингредиентов через запятую'
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(ConditionalGetMixin, ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (permissions.AllowAny, )
     pagination_class = None
+    version_names = ('tag',)
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(ConditionalGetMixin, ReadOnlyModelViewSet):
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
     permission_classes = (permissions.AllowAny, )
     filter_backends = (DjangoFilterBackend, )
     filter_class = IngredientFilter
     pagination_class = None
+    version_names = ('ingredient',)
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('name'):
+            return super().list(request, *args, **kwargs)
+        return self.conditional(request, self.search)
+
+    def search(self, request):
+        name = request.query_params.get('name')
+        limit = request.query_params.get('limit')
+        if limit is not None and limit.isnumeric():
+            limit = int(limit)
+        else:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        return Response(ingredient_index.search(name, limit=limit))
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(
+    ConditionalGetMixin, AnonymousListCacheMixin, ModelViewSet
+):
     queryset = Recipe.objects.all().order_by('-id')
     filter_backends = (DjangoFilterBackend,)
     filter_class = RecipeFilters
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, )
     pagination_class = RecipesPagination
+    version_names = ('recipe', 'tag', 'ingredient', 'user')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            return queryset.with_related()
+        return queryset
+
+    def get_version_names(self, request):
+        names = super().get_version_names(request)
+        if request.query_params.get('ordering') == POPULAR_ORDERING:
+            names.append('popularity')
+        return names
+
+    def get_list_version_names(self, request):
+        names = super().get_list_version_names(request)
+        if request.query_params.get('ordering') == POPULAR_ORDERING:
+            names.append('popularity')
+        return names
 
     def get_serializer_class(self):
+        if self.action in ('list', 'trending'):
+            return RecipeListSerializer
+        if self.action == 'cook':
+            return RecipeCoverageSerializer
         if self.request.method == 'GET':
             return RecipeSerializer
         return RecipePostSerializer
@@ -57,6 +109,7 @@ class RecipeViewSet(ModelViewSet):
         methods=['GET', 'DELETE'],
         permission_classes=[permissions.IsAuthenticated]
     )
+    @read_from_primary
     def favorite(self, request, pk):
         serializer = FavoriteRecipesSerializer(
             data={
@@ -87,6 +140,7 @@ class RecipeViewSet(ModelViewSet):
         methods=['GET', 'DELETE'],
         permission_classes=(permissions.IsAuthenticated, )
     )
+    @read_from_primary
     def shopping_cart(self, request, pk):
         serializer = IngredientListSerializer(
             data={
@@ -112,38 +166,71 @@ class RecipeViewSet(ModelViewSet):
                 status=status.HTTP_204_NO_CONTENT
             )
 
+    @action(detail=False)
+    def cook(self, request):
+        ingredients = ','.join(request.query_params.getlist('ingredients'))
+        ids = [value.strip() for value in ingredients.split(',')]
+        if not all(value.isdecimal() for value in ids):
+            return Response(
+                {'errors': COOK_INGREDIENTS_ERROR},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.filter_queryset(self.get_queryset()).cookable(
+            {int(value) for value in ids}
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False)
+    def trending(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            popularity__gt=0
+        ).order_by('-popularity', '-id')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        ids = paginator.paginate_sources(
+            get_feed_sources(request.user), request
+        )
+        recipes = Recipe.objects.with_related().in_bulk(ids)
+        serializer = RecipeListSerializer(
+            [recipes[pk] for pk in ids if pk in recipes],
+            many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
     @action(
         detail=False,
         permission_classes=(permissions.IsAuthenticated,)
     )
     def download_shopping_cart(self, request):
-        buying_list = {}
+        file_format = request.query_params.get('file_format', 'txt')
+        if file_format not in EXPORTERS:
+            return Response(
+                {'errors': SHOPPING_CART_FORMAT_ERROR},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         shopping_cart = IngredientInRecipe.objects.filter(
             recipe__ingredient_list__user=request.user
-        ).values_list(
-            'amount',
-            'ingredients__name',
-            'ingredients__measurement_unit',
-            named=True
-        ).order_by('id')
-        for ingredient in shopping_cart:
-            measurement_unit = ingredient.ingredients__measurement_unit
-            name = ingredient.ingredients__name
-            amount = ingredient.amount
-
-            if name not in buying_list:
-                buying_list[name] = {
-                    'amount': amount,
-                    'measurement_unit': measurement_unit,
-                }
-            else:
-                buying_list[name]['amount'] = (buying_list[name]['amount']
-                                               + amount)
-        wishlist = []
-        for item in buying_list:
-            wishlist.append(f'{item} - {buying_list[item]["amount"]}'
-                            f' {buying_list[item]["measurement_unit"]} \n')
-
-        response = HttpResponse(wishlist, 'Content-Type: text/plain')
-        response['Content-Disposition'] = 'attachment; filename="wishlist.txt"'
+        ).values(
+            name=F('ingredients__name'),
+            measurement_unit=F('ingredients__measurement_unit'),
+        ).annotate(
+            amount=Sum('amount')
+        ).order_by('name', 'measurement_unit')
+        response = StreamingHttpResponse(
+            EXPORTERS[file_format](shopping_cart.iterator()),
+            content_type=SHOPPING_CART_FORMATS[file_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="wishlist.{file_format}"'
+        )
         return response
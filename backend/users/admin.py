@@ -5,7 +5,8 @@ from .models import Subscription, User
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'username', 'role')
+    list_display = ('pk', 'username', 'role', 'recipes_count')
+    readonly_fields = ('recipes_count',)
     search_fields = ('username', 'email')
     list_filter = ('role',)
     empty_value_display = '-пусто-'
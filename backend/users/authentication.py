@@ -0,0 +1,96 @@
+import copy
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_CACHE_KEY = 'auth-token:{}'
+
+
+class TokenCache:
+    def __init__(
+        self, max_size=settings.TOKEN_CACHE_SIZE,
+        ttl=settings.TOKEN_CACHE_TTL, shared=settings.TOKEN_CACHE
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self.local_ttl = min(ttl, settings.TOKEN_CACHE_LOCAL_TTL)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_shared(self):
+        return caches[self.shared] if self.shared is not None else None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                (user, token), expires = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return copy.copy(user), token
+                del self._entries[key]
+        shared = self.get_shared()
+        if shared is None:
+            return None
+        credentials = shared.get(TOKEN_CACHE_KEY.format(key))
+        if credentials is not None:
+            self.set_local(key, credentials)
+        return credentials
+
+    def set_local(self, key, credentials):
+        with self._lock:
+            self._entries[key] = (
+                credentials, time.monotonic() + self.local_ttl
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def set(self, key, credentials):
+        self.set_local(key, credentials)
+        shared = self.get_shared()
+        if shared is not None:
+            shared.set(TOKEN_CACHE_KEY.format(key), credentials, self.ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        shared = self.get_shared()
+        if shared is not None:
+            shared.delete_many(TOKEN_CACHE_KEY.format(key) for key in keys)
+
+    def delete_user(self, user_id):
+        with self._lock:
+            keys = [
+                key for key, ((user, _), _) in self._entries.items()
+                if user.id == user_id
+            ]
+        keys.extend(
+            Token.objects.filter(user_id=user_id).values_list('key', flat=True)
+        )
+        self.delete(*keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        credentials = token_cache.get(key)
+        if credentials is not None:
+            return credentials
+        credentials = super().authenticate_credentials(key)
+        token_cache.set(key, credentials)
+        return credentials
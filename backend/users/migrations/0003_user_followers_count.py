@@ -0,0 +1,32 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:13
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_followers_count(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    User = apps.get_model('users', 'User')
+    User.objects.update(followers_count=Coalesce(models.Subquery(
+        Subscription.objects.filter(
+            author=models.OuterRef('pk')
+        ).order_by().values('author').annotate(
+            total=models.Count('pk')
+        ).values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество подписчиков'),
+        ),
+        migrations.RunPython(fill_followers_count, migrations.RunPython.noop),
+    ]
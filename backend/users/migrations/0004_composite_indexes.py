@@ -0,0 +1,17 @@
+# Generated by Django 3.2.8 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_followers_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('author__isnull', False)), fields=['author', 'user'], name='subscription_author_user_idx'),
+        ),
+    ]
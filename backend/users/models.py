@@ -37,6 +37,14 @@ class User(AbstractUser):
         choices=ROLE,
         default=USER
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество рецептов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name')
@@ -78,3 +86,8 @@ class Subscription(models.Model):
             models.UniqueConstraint(fields=["user", "author"],
                                     name="followed_author")
         ]
+        indexes = [
+            models.Index(fields=['author', 'user'],
+                         name='subscription_author_user_idx',
+                         condition=models.Q(author__isnull=False))
+        ]
@@ -4,7 +4,12 @@ from rest_framework.permissions import BasePermission
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        return(
+        return request.user.is_authenticated and request.user.is_admin
+
+
+class IsAdminOrReadOnly(BasePermission):
+    def has_permission(self, request, view):
+        return (
             request.method in permissions.SAFE_METHODS
             or request.user.is_authenticated
             and request.user.is_admin
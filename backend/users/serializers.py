@@ -4,7 +4,9 @@ from djoser.serializers import (
 )
 from rest_framework import serializers
 
+from recipes.fields import RecipeImageField
 from recipes.models import Recipe
+from recipes.relations import get_relations
 from .models import Subscription, User
 
 WRONG_PASSWORD = 'Неправильный пароль, попробуйте еще раз.'
@@ -39,15 +41,8 @@ class UserDetailSerializer(UserSerializer):
         lookup_field = 'username'
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if request is None:
-            return False
-        if request.user.is_anonymous:
-            return False
-        else:
-            return Subscription.objects.filter(
-                user=request.user, author=obj
-            ).exists()
+        relations = get_relations(self.context.get('request'))
+        return obj.id in relations.subscriptions
 
 
 class ChangePasswordSerializer(SetPasswordSerializer):
@@ -84,6 +79,7 @@ class SubscribeSerializer(serializers.ModelSerializer):
 
 
 class SubscribeRecipeSerializer(serializers.ModelSerializer):
+    image = RecipeImageField(rendition='thumbnail')
 
     class Meta:
         model = Recipe
@@ -92,7 +88,7 @@ class SubscribeRecipeSerializer(serializers.ModelSerializer):
 
 class RecipeAuthorSerializer(UserDetailSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta(UserDetailSerializer.Meta):
         fields = (
@@ -107,14 +103,14 @@ class RecipeAuthorSerializer(UserDetailSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context['request']
-        recipes_limit = request.query_params.get('recipes_limit')
-        queryset = Recipe.objects.filter(author=obj)
-        if recipes_limit is not None and recipes_limit.isnumeric():
-            recipes_limit = int(recipes_limit)
-            queryset = queryset[:recipes_limit]
+        previews = self.context.get('recipes_previews')
+        if previews is not None:
+            queryset = previews.get(obj.id, ())
+        else:
+            request = self.context['request']
+            recipes_limit = request.query_params.get('recipes_limit')
+            queryset = Recipe.objects.filter(author=obj)
+            if recipes_limit is not None and recipes_limit.isnumeric():
+                recipes_limit = int(recipes_limit)
+                queryset = queryset[:recipes_limit]
         return [SubscribeRecipeSerializer(query).data for query in queryset]
-
-    def get_recipes_count(self, obj):
-        queryset = Recipe.objects.filter(author=obj)
-        return queryset.count()
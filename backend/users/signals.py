@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import User
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    token_cache.delete_user(instance.id)
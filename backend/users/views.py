@@ -3,6 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+from foodgram.db_router import read_from_primary
+from recipes.models import Recipe
+
 from .models import Subscription, User
 from .serializers import (
     ChangePasswordSerializer, RecipeAuthorSerializer, SubscribeSerializer,
@@ -18,6 +21,7 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserDetailSerializer
     queryset = User.objects.all()
     permission_classes = (permissions.AllowAny, )
+    cursor_ordering = ('id',)
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -41,6 +45,7 @@ class UserViewSet(viewsets.ModelViewSet):
         methods=['GET', 'DELETE'],
         permission_classes=(permissions.IsAuthenticated,),
     )
+    @read_from_primary
     def subscribe(self, request, pk):
         data = {'user': request.user.id,
                 'author': pk}
@@ -69,19 +74,34 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def subscriptions(self, request):
         subscriber = User.objects.filter(
-            author__in=request.user.subscriber.all()
+            author__user=request.user
         ).order_by('id')
         page = self.paginate_queryset(subscriber)
-        if page is not None:
-            serializer = RecipeAuthorSerializer(
-                subscriber, many=True, context={'request': request}
-            )
-            return self.get_paginated_response(serializer.data)
+        authors = page if page is not None else list(subscriber)
         serializer = RecipeAuthorSerializer(
-            subscriber, many=True, context={'request': request}
+            authors, many=True, context={
+                'request': request,
+                'recipes_previews': self.get_recipes_previews(authors),
+            }
         )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_recipes_previews(self, authors):
+        recipes = Recipe.objects.filter(
+            author__in=[author.id for author in authors]
+        )
+        recipes_limit = self.request.query_params.get('recipes_limit')
+        if recipes_limit is not None and recipes_limit.isnumeric():
+            recipes = recipes.latest_by_author(int(recipes_limit))
+        else:
+            recipes = recipes.order_by('-pub_date', '-id')
+        previews = {}
+        for recipe in recipes:
+            previews.setdefault(recipe.author_id, []).append(recipe)
+        return previews
+
     @action(
         detail=False,
         methods=['POST'],